@@ -7,30 +7,45 @@ With Debug Endpoints for troubleshooting.
 
 from fastapi import FastAPI, HTTPException, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
 from bs4 import BeautifulSoup
 from typing import Optional, List, Dict, Any
 import traceback
-import json
+import orjson
+import os
 import re
 import shutil
+import sqlite3
+import concurrent.futures
+import itertools
+import threading
+import time
+import urllib.parse
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # Import website_bot
 try:
     import website_bot
-    import importlib
-    importlib.reload(website_bot)
     print("✅ website_bot imported successfully")
 except Exception as e:
     print(f"❌ Error importing website_bot: {e}")
     raise
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the chunking tokenizer before serving, so no request waits on its download."""
+    website_bot.get_token_encoder()
+    yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Website Info Extractor API",
     description="Extract business information, contacts, social links, and theme colors from websites",
-    version="2.1.0"
+    version="2.1.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -46,12 +61,146 @@ app.add_middleware(
 router = APIRouter(prefix="/api")
 
 
+# ---------------- Debug Patterns (compiled once) ----------------
+_PIN_RE = re.compile(r'\b\d{6}\b')
+_ZIP_RE = re.compile(r'\b\d{5}\b')
+_TEST_ADDRESS_PATTERNS = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in {
+    "indian_pin_context": r'([A-Za-z0-9][A-Za-z0-9\s,.\-/]{10,150}?\b\d{6})\b',
+    "starts_with_number": r'\b(\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/]{10,120})',
+    "us_zip_with_state": r'([A-Za-z0-9][A-Za-z0-9\s,.\-]{15,100}\s+[A-Z]{2}\s*\d{5}(?:-\d{4})?)\b',
+    "after_address_label": r'(?:Address|Location|Office)[:\s]+([A-Za-z0-9#/,.\s\-]{15,200})',
+    "near_opposite_pattern": r'((?:Near|Opp\.?|Opposite|Behind)[A-Za-z0-9\s,.\-]{15,120}\d{6})',
+    "floor_building_pattern": r'((?:Floor|Office|Tower|Building)[^,]*,[^,]+,[^,]+)',
+}.items()}
+
+
+def first_matches(pattern, text, limit):
+    """First `limit` matches of `pattern`, without scanning the rest of `text`."""
+    return [m.group(0) for m in itertools.islice(pattern.finditer(text), limit)]
+
+
+# ---------------- Result Cache ----------------
+# Finished /scrape responses, keyed on the normalized URL. Kept in SQLite (not
+# process memory) so every uvicorn worker sees the same entries and a
+# force_refresh or cache clear handled by one worker evicts them for all.
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "600"))
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "512"))
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "./cache/results.sqlite")
+_result_cache_conn = None
+_result_cache_lock = threading.Lock()
+
+
+def _result_cache():
+    """Open (once per process) the shared result cache database; None if it can't be used."""
+    global _result_cache_conn
+    if _result_cache_conn is None:
+        try:
+            os.makedirs(os.path.dirname(RESULT_CACHE_PATH) or ".", exist_ok=True)
+            conn = sqlite3.connect(RESULT_CACHE_PATH, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL)"
+            )
+            conn.commit()
+            _result_cache_conn = conn
+        except Exception as e:
+            print(f"⚠️ Result cache unavailable: {e}")
+            _result_cache_conn = False
+    return _result_cache_conn or None
+
+
+def result_cache_key(url: str) -> str:
+    """Normalize a URL for caching: lowercase host, no trailing slash, fragment or utm_* params."""
+    try:
+        parsed = urllib.parse.urlparse(url.strip())
+        query = urllib.parse.urlencode([
+            (k, v) for k, v in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+            if not k.lower().startswith("utm_")
+        ])
+        return urllib.parse.urlunparse((
+            parsed.scheme.lower(),
+            parsed.netloc.lower(),
+            parsed.path.rstrip("/"),
+            "",
+            query,
+            ""
+        ))
+    except Exception:
+        return url
+
+
+def result_cache_get(key: str):
+    """Return a cached response if it is still fresh."""
+    with _result_cache_lock:
+        conn = _result_cache()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT value FROM results WHERE key = ? AND created >= ?",
+                (key, time.time() - RESULT_CACHE_TTL)
+            ).fetchone()
+            return orjson.loads(row[0]) if row else None
+        except Exception as e:
+            print(f"⚠️ Result cache read error: {e}")
+            return None
+
+
+def result_cache_set(key: str, value):
+    """Store a response; expired entries and the oldest beyond RESULT_CACHE_SIZE are evicted."""
+    with _result_cache_lock:
+        conn = _result_cache()
+        if conn is None:
+            return
+        try:
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created) VALUES (?, ?, ?)",
+                (key, orjson.dumps(value), now)
+            )
+            conn.execute("DELETE FROM results WHERE created < ?", (now - RESULT_CACHE_TTL,))
+            conn.execute(
+                "DELETE FROM results WHERE key NOT IN "
+                "(SELECT key FROM results ORDER BY created DESC LIMIT ?)",
+                (RESULT_CACHE_SIZE,)
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"⚠️ Result cache write error: {e}")
+
+
+def result_cache_clear(key: str = None):
+    """Drop one URL from the result cache, or everything when no key is given."""
+    with _result_cache_lock:
+        conn = _result_cache()
+        if conn is None:
+            return
+        try:
+            if key is None:
+                conn.execute("DELETE FROM results")
+            else:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            conn.commit()
+        except Exception as e:
+            print(f"⚠️ Result cache clear error: {e}")
+
+
 # ---------------- Pydantic Models ----------------
 class URLRequest(BaseModel):
     url: str = Field(..., description="The website URL to scrape")
     force_refresh: bool = Field(False, description="Clear cache and re-scrape")
     debug: bool = Field(False, description="Include debug information in response")
 
+    @field_validator("url")
+    @classmethod
+    def normalize_url(cls, v: str) -> str:
+        """Strip whitespace and default to https:// when no scheme is given."""
+        v = v.strip()
+        if v and not v.startswith("http"):
+            v = "https://" + v
+        return v
+
 
 class ThemeColors(BaseModel):
     Primary: str = ""
@@ -94,10 +243,7 @@ def debug_address_extraction(request: URLRequest):
     🔍 DEBUG: See exactly why addresses aren't being extracted.
     Returns detailed information about the extraction process.
     """
-    site_url = request.url.strip()
-    
-    if not site_url.startswith("http"):
-        site_url = "https://" + site_url
+    site_url = request.url
 
     try:
         print(f"\n{'='*60}")
@@ -105,7 +251,7 @@ def debug_address_extraction(request: URLRequest):
         print(f"{'='*60}\n")
         
         # Get pages
-        all_urls = website_bot.get_site_urls(site_url)
+        all_urls = website_bot.get_site_urls(site_url, use_cache=not request.force_refresh)
         main_pages = website_bot.select_main_pages(all_urls, site_url)
         
         debug_info = {
@@ -125,20 +271,16 @@ def debug_address_extraction(request: URLRequest):
             "issues_detected": []
         }
         
-        all_text = ""
-        all_html = ""
+        text_parts = []
         
-        for page in main_pages:
+        for page, html in website_bot.fetch_pages(main_pages, use_cache=not request.force_refresh):
             try:
-                print(f"📄 Fetching: {page}")
-                html = website_bot.fetch_page(page)
+                print(f"📄 Fetched: {page}")
                 
                 if not html:
                     debug_info["issues_detected"].append(f"No HTML returned for {page}")
                     continue
                 
-                all_html += " " + html
-                
                 # Analyze HTML
                 html_lower = html.lower()
                 page_analysis = {
@@ -151,15 +293,16 @@ def debug_address_extraction(request: URLRequest):
                     "has_ahmedabad": "ahmedabad" in html_lower,
                     "has_gujarat": "gujarat" in html_lower,
                     "has_india": "india" in html_lower,
-                    "pin_codes_in_html": re.findall(r'\b\d{6}\b', html)[:5],
+                    "pin_codes_in_html": first_matches(_PIN_RE, html, 5),
                 }
                 debug_info["html_analysis"][page] = page_analysis
                 
                 # Extract text
-                soup = BeautifulSoup(html, "html.parser")
-                [s.extract() for s in soup(["script", "style", "noscript"])]
+                soup = BeautifulSoup(html, "lxml")
+                for tag in soup(["script", "style", "noscript"]):
+                    tag.decompose()
                 page_text = website_bot.clean_text(soup.get_text(" ", strip=True))
-                all_text += " " + page_text
+                text_parts.append(page_text)
                 
                 # Sample of text
                 debug_info["raw_text_samples"].append({
@@ -205,15 +348,17 @@ def debug_address_extraction(request: URLRequest):
             except Exception as e:
                 debug_info["issues_detected"].append(f"Error on {page}: {str(e)}")
         
+        all_text = " ".join(text_parts)
+        
         # Analyze extracted text
         text_lower = all_text.lower()
         
         # Find PIN codes
-        pin_codes = list(set(re.findall(r'\b\d{6}\b', all_text)))
+        pin_codes = list(dict.fromkeys(_PIN_RE.findall(all_text)))
         debug_info["pin_codes_found"] = pin_codes
         
         # Find ZIP codes
-        zip_codes = list(set(re.findall(r'\b\d{5}\b', all_text)))[:10]
+        zip_codes = list(dict.fromkeys(_ZIP_RE.findall(all_text)))[:10]
         debug_info["zip_codes_found"] = zip_codes
         
         # Check for address keywords
@@ -302,15 +447,12 @@ def debug_address_extraction(request: URLRequest):
 def debug_raw_html(request: URLRequest):
     """
     🔍 DEBUG: Get raw HTML content from a page.
-    Useful to see what content is actually being fetched.
+    Useful to see what content is actually being fetched, so the page cache is bypassed.
     """
-    site_url = request.url.strip()
-    
-    if not site_url.startswith("http"):
-        site_url = "https://" + site_url
+    site_url = request.url
 
     try:
-        html = website_bot.fetch_page(site_url)
+        html = website_bot.fetch_page(site_url, use_cache=False)
         
         if not html:
             return {
@@ -319,9 +461,8 @@ def debug_raw_html(request: URLRequest):
                 "url": site_url
             }
         
-        soup = BeautifulSoup(html, "html.parser")
-        [s.extract() for s in soup(["script", "style", "noscript"])]
-        text = soup.get_text(" ", strip=True)
+        text = website_bot.html_to_text(html)
+        html_lower = html.lower()
         
         return {
             "success": True,
@@ -331,13 +472,13 @@ def debug_raw_html(request: URLRequest):
             "html_preview": html[:3000] + "..." if len(html) > 3000 else html,
             "text_preview": text[:2000] + "..." if len(text) > 2000 else text,
             "contains": {
-                "address": "address" in html.lower(),
-                "contact": "contact" in html.lower(),
-                "email": "email" in html.lower() or "@" in html,
-                "phone": "phone" in html.lower() or "tel:" in html.lower(),
-                "pin_codes": re.findall(r'\b\d{6}\b', html)[:10],
+                "address": "address" in html_lower,
+                "contact": "contact" in html_lower,
+                "email": "email" in html_lower or "@" in html,
+                "phone": "phone" in html_lower or "tel:" in html_lower,
+                "pin_codes": first_matches(_PIN_RE, html, 10),
                 "is_nextjs": "__next" in html,
-                "is_react": "react" in html.lower()
+                "is_react": "react" in html_lower
             }
         }
     except Exception as e:
@@ -353,32 +494,18 @@ def debug_test_patterns(request: URLRequest):
     🔍 DEBUG: Test address extraction patterns on a URL.
     Shows what each regex pattern finds.
     """
-    site_url = request.url.strip()
-    
-    if not site_url.startswith("http"):
-        site_url = "https://" + site_url
+    site_url = request.url
 
     try:
         # Fetch and get text
-        html = website_bot.fetch_page(site_url)
-        soup = BeautifulSoup(html or "", "html.parser")
-        [s.extract() for s in soup(["script", "style", "noscript"])]
-        text = website_bot.clean_text(soup.get_text(" ", strip=True))
+        html = website_bot.fetch_page(site_url, use_cache=not request.force_refresh)
+        text = website_bot.html_to_text(html)
         
         # Test patterns
-        patterns = {
-            "indian_pin_context": r'([A-Za-z0-9][A-Za-z0-9\s,.\-/]{10,150}?\b\d{6})\b',
-            "starts_with_number": r'\b(\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/]{10,120})',
-            "us_zip_with_state": r'([A-Za-z0-9][A-Za-z0-9\s,.\-]{15,100}\s+[A-Z]{2}\s*\d{5}(?:-\d{4})?)\b',
-            "after_address_label": r'(?:Address|Location|Office)[:\s]+([A-Za-z0-9#/,.\s\-]{15,200})',
-            "near_opposite_pattern": r'((?:Near|Opp\.?|Opposite|Behind)[A-Za-z0-9\s,.\-]{15,120}\d{6})',
-            "floor_building_pattern": r'((?:Floor|Office|Tower|Building)[^,]*,[^,]+,[^,]+)',
-        }
-        
         results = {}
-        for name, pattern in patterns.items():
+        for name, pattern in _TEST_ADDRESS_PATTERNS.items():
             try:
-                matches = re.findall(pattern, text, re.IGNORECASE)
+                matches = pattern.findall(text)
                 results[name] = {
                     "matches_count": len(matches),
                     "matches": matches[:5]  # Limit to 5
@@ -405,32 +532,18 @@ def debug_test_patterns(request: URLRequest):
 @router.post("/cache/clear-all")
 def clear_all_cache():
     """
-    🗑️ Clear ALL ChromaDB collections (full cache reset).
+    🗑️ Clear ALL cached scrape results (full cache reset).
     """
+    result_cache_clear()
+
     try:
-        if website_bot.chroma_client is None:
-            return {
-                "success": False,
-                "message": "ChromaDB client not initialized"
-            }
-        
-        collections = website_bot.chroma_client.list_collections()
-        deleted = []
-        errors = []
-        
-        for collection in collections:
-            try:
-                website_bot.chroma_client.delete_collection(name=collection.name)
-                deleted.append(collection.name)
-                print(f"🗑️ Deleted: {collection.name}")
-            except Exception as e:
-                errors.append({"collection": collection.name, "error": str(e)})
-        
+        website_bot.rag_cache_clear()
+        website_bot.html_cache_clear()
+        website_bot.completion_cache_clear()
+        print("🗑️ Cleared all cached results")
         return {
             "success": True,
-            "message": f"Cleared {len(deleted)} collections",
-            "deleted": deleted,
-            "errors": errors if errors else None
+            "message": "Cleared all cached results"
         }
     except Exception as e:
         return {
@@ -442,35 +555,20 @@ def clear_all_cache():
 @router.post("/cache/clear")
 def clear_url_cache(request: URLRequest):
     """
-    🗑️ Clear ChromaDB cache for a specific URL.
+    🗑️ Clear cached scrape results for a specific URL.
     """
-    site_url = request.url.strip()
-    
-    if not site_url.startswith("http"):
-        site_url = "https://" + site_url
+    site_url = request.url
+    result_cache_clear(result_cache_key(site_url))
 
     try:
-        if website_bot.chroma_client is None:
-            return {
-                "success": False,
-                "message": "ChromaDB client not initialized"
-            }
-        
-        collection_name = website_bot.sanitize_collection_name(site_url)
-        
-        try:
-            website_bot.chroma_client.delete_collection(name=collection_name)
-            return {
-                "success": True,
-                "message": f"Cache cleared for {site_url}",
-                "collection_name": collection_name
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Collection not found or error: {str(e)}",
-                "collection_name": collection_name
-            }
+        website_bot.rag_cache_clear(site_url)
+        website_bot.html_cache_clear(site_url)
+        website_bot.completion_cache_clear(site_url)
+        print(f"🗑️ Cleared cache: {site_url}")
+        return {
+            "success": True,
+            "message": f"Cache cleared for {site_url}"
+        }
     except Exception as e:
         return {
             "success": False,
@@ -547,6 +645,278 @@ def reset_chroma_directory():
 
 # ================== MAIN SCRAPE ENDPOINT (UPDATED) ==================
 
+# Response shape for /scrape; the merge copies these shallowly, so never mutate them
+SCRAPE_DEFAULTS = {
+    "Business Name": "",
+    "About Us": "",
+    "Main Services": [],
+    "Description": "",
+    "Email": [],
+    "Phone": [],
+    "Address": [],
+    "Facebook": "",
+    "Instagram": "",
+    "LinkedIn": "",
+    "Twitter / X": "",
+    "Logo": "",
+    "Theme Colors": {"Primary": "", "Secondary": "", "Accent": "", "Palette": []},
+    "URL": ""
+}
+LIST_FIELDS = ("Email", "Phone", "Address", "Main Services")
+
+
+def extract_page_content(page: str, html: str):
+    """
+    Per-page social and text extraction, run on the fetch worker thread.
+    Returns (html, soup, social, text); the soup is handed back so theme
+    colours can reuse it instead of parsing the page again.
+    """
+    if not html:
+        return html, None, {}, ""
+
+    soup = None
+    try:
+        soup = BeautifulSoup(html, "lxml")
+        social = website_bot.extract_social_links_from_html(html, soup=soup)
+    except Exception as e:
+        print(f"   ⚠️ Social extraction error for {page}: {e}")
+        social = {}
+
+    try:
+        text = website_bot.html_to_text(html)
+    except Exception as e:
+        print(f"   ⚠️ Text extraction error for {page}: {e}")
+        text = ""
+
+    return html, soup, social, text
+
+
+def scrape_events(request: URLRequest, debug_info: Optional[dict] = None):
+    """
+    Run the full scrape pipeline, yielding progress events as it goes.
+    The last event is {"event": "result", ...} carrying the final response.
+    """
+    site_url = request.url
+
+    print(f"\n{'='*50}")
+    print(f"🔍 Starting scrape for: {site_url}")
+    print(f"   Force refresh: {request.force_refresh}")
+    print(f"   Debug mode: {request.debug}")
+    print(f"{'='*50}\n")
+
+    # Clear cache if force_refresh
+    if request.force_refresh:
+        try:
+            website_bot.rag_cache_clear(site_url)
+            print(f"🔄 Cleared cache: {site_url}")
+        except Exception as e:
+            print(f"⚠️ Cache clear warning: {e}")
+
+    # Get URLs from sitemap or Firecrawl
+    all_urls = website_bot.get_site_urls(site_url, use_cache=not request.force_refresh)
+    main_pages = website_bot.select_main_pages(all_urls, site_url)
+
+    print(f"📌 Selected pages to scrape: {main_pages}")
+
+    if request.debug:
+        debug_info["pages_found"] = len(all_urls)
+        debug_info["pages_scraped"] = main_pages
+
+    yield {"event": "pages", "pages": main_pages}
+
+    text_parts = []
+    html_parts = []
+    # Contact page text/HTML, tried first for emails and phones
+    contact_text_parts = []
+    contact_html_parts = []
+    all_social = {"Facebook": "", "Instagram": "", "LinkedIn": "", "Twitter / X": ""}
+    logo_url_found = None
+    theme_colors = {}
+
+    # Scrape each page (social/text extraction happens on the fetch workers)
+    for page, (html, page_soup, page_social, page_text) in website_bot.fetch_pages(
+        main_pages, process=extract_page_content, use_cache=not request.force_refresh
+    ):
+        try:
+            print(f"\n📄 Processing: {page}")
+
+            if not html:
+                print(f"   ⚠️ No HTML content fetched")
+                continue
+
+            html_parts.append(html)
+            if website_bot.is_contact_page(page):
+                contact_text_parts.append(page_text)
+                contact_html_parts.append(html)
+
+            # Extract logo (first page only)
+            if not logo_url_found:
+                logo = website_bot.extract_logo_url(html, page, soup=page_soup)
+                if logo:
+                    logo_url_found = logo
+                    print(f"   🖼️ Logo found: {logo}")
+
+            # Extract theme colors
+            if not theme_colors.get("primary_color"):
+                theme_colors = website_bot.extract_theme_colors(html, page, soup=page_soup)
+                if theme_colors.get("primary_color"):
+                    print(f"   🎨 Primary color: {theme_colors['primary_color']}")
+
+            # Merge social links
+            new_social = {}
+            for k, v in page_social.items():
+                if v and not all_social[k]:
+                    all_social[k] = v
+                    new_social[k] = v
+                    print(f"   📱 {k}: {v}")
+
+            text_parts.append(page_text)
+
+            print(f"   ✅ Extracted {len(page_text)} characters of text")
+
+            yield {
+                "event": "page",
+                "url": page,
+                "text_length": len(page_text),
+                "logo": logo_url_found or "",
+                "primary_color": theme_colors.get("primary_color", ""),
+                "social": new_social
+            }
+
+        except Exception as e:
+            print(f"   ❌ Error processing page {page}: {e}")
+            continue
+
+    # Clean and chunk text
+    all_html = " ".join(html_parts)
+    all_text = website_bot.clean_text(" ".join(website_bot.budget_page_texts(text_parts)))
+    contact_html = " ".join(contact_html_parts)
+    contact_text = website_bot.clean_text(" ".join(contact_text_parts))
+    chunks = website_bot.chunk_text(website_bot.dedupe_sentences(all_text))
+
+    print(f"\n📊 Total text: {len(all_text)} chars, {len(chunks)} chunks")
+
+    if request.debug:
+        debug_info["total_text_length"] = len(all_text)
+        debug_info["chunks_count"] = len(chunks)
+        debug_info["text_preview"] = all_text[:1000]
+        debug_info["pin_codes_found"] = _PIN_RE.findall(all_text)
+
+    # Run RAG extraction
+    yield {"event": "rag", "chunks": len(chunks)}
+    print("\n🧠 Running RAG extraction...")
+    # The LLM round-trip is network-bound; the regex fallbacks run meanwhile
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        rag_future = pool.submit(
+            website_bot.rag_extract, chunks, site_url, use_cache=not request.force_refresh
+        )
+        extracted_emails, extracted_phones, extracted_addresses = website_bot.extract_fallback_contacts(
+            all_text, all_html, contact_text, contact_html
+        )
+        data = rag_future.result()
+
+    # Ensure data is a dict
+    if not isinstance(data, dict):
+        data = {}
+
+    # Add logo
+    data["Logo"] = logo_url_found or ""
+
+    # Add theme colors
+    data["Theme Colors"] = {
+        "Primary": theme_colors.get("primary_color", ""),
+        "Secondary": theme_colors.get("secondary_color", ""),
+        "Accent": theme_colors.get("accent_color", ""),
+        "Palette": theme_colors.get("color_palette", [])
+    }
+
+    # Merge and clean emails
+    try:
+        existing_emails = data.get("Email", [])
+        if isinstance(existing_emails, str):
+            existing_emails = [existing_emails] if existing_emails else []
+        if not isinstance(existing_emails, list):
+            existing_emails = []
+        all_emails = existing_emails + extracted_emails
+        data["Email"] = website_bot.clean_email_list(all_emails)
+
+        if request.debug:
+            debug_info["emails_extracted"] = extracted_emails
+            debug_info["emails_final"] = data["Email"]
+    except Exception as e:
+        print(f"❌ Error extracting emails: {e}")
+        data["Email"] = []
+
+    # Merge and clean phones
+    try:
+        existing_phones = data.get("Phone", [])
+        if isinstance(existing_phones, str):
+            existing_phones = [existing_phones] if existing_phones else []
+        if not isinstance(existing_phones, list):
+            existing_phones = []
+        all_phones = existing_phones + extracted_phones
+        data["Phone"] = website_bot.clean_phone_list(all_phones)
+
+        if request.debug:
+            debug_info["phones_extracted"] = extracted_phones
+    except Exception as e:
+        print(f"❌ Error extracting phones: {e}")
+        data["Phone"] = []
+
+    # Merge and clean addresses with DEBUG
+    try:
+        print("\n🏠 Address extraction debug:")
+        print(f"   Raw extracted: {extracted_addresses}")
+
+        existing_addresses = data.get("Address", [])
+        if isinstance(existing_addresses, str):
+            existing_addresses = [existing_addresses] if existing_addresses else []
+        if not isinstance(existing_addresses, list):
+            existing_addresses = []
+
+        print(f"   From RAG: {existing_addresses}")
+
+        all_addresses = existing_addresses + extracted_addresses
+        print(f"   Combined: {all_addresses}")
+
+        data["Address"] = website_bot.clean_address_list(all_addresses)
+        print(f"   After cleaning: {data['Address']}")
+
+        if request.debug:
+            debug_info["addresses_from_rag"] = existing_addresses
+            debug_info["addresses_extracted"] = extracted_addresses
+            debug_info["addresses_combined"] = all_addresses
+            debug_info["addresses_final"] = data["Address"]
+    except Exception as e:
+        print(f"❌ Error extracting addresses: {e}")
+        traceback.print_exc()
+        data["Address"] = []
+
+    # Add social links
+    for k, v in all_social.items():
+        if v:
+            data[k] = v
+
+    data["URL"] = site_url
+
+    # Set defaults (missing or None fields fall back to SCRAPE_DEFAULTS)
+    data = {**SCRAPE_DEFAULTS, **{k: v for k, v in data.items() if v is not None}}
+    for k in LIST_FIELDS:
+        if not isinstance(data[k], list):
+            data[k] = [data[k]] if data[k] else []
+
+    print(f"\n{'='*50}")
+    print("✅ Scraping completed successfully!")
+    print(f"{'='*50}\n")
+
+    response = {"success": True, "message": "Scraping Successful", "data": data}
+
+    if request.debug:
+        response["debug"] = debug_info
+
+    yield {"event": "result", **response}
+
+
 @router.post("/scrape", response_model=ScrapeResponse)
 def scrape(request: URLRequest):
     """
@@ -556,237 +926,71 @@ def scrape(request: URLRequest):
     - **force_refresh**: Clear cache and re-scrape (default: false)
     - **debug**: Include debug info in response (default: false)
     """
-    site_url = request.url.strip()
+    site_url = request.url
     
     if not site_url:
         raise HTTPException(status_code=400, detail="Missing 'url' parameter")
-    
-    if not site_url.startswith("http"):
-        site_url = "https://" + site_url
 
     debug_info = {} if request.debug else None
+    cache_key = result_cache_key(site_url)
+
+    if request.force_refresh:
+        result_cache_clear(cache_key)
+    elif not request.debug:
+        cached = result_cache_get(cache_key)
+        if cached is not None:
+            print(f"⚡ Result cache hit: {site_url}")
+            return cached
 
     try:
-        print(f"\n{'='*50}")
-        print(f"🔍 Starting scrape for: {site_url}")
-        print(f"   Force refresh: {request.force_refresh}")
-        print(f"   Debug mode: {request.debug}")
-        print(f"{'='*50}\n")
-        
-        # Clear cache if force_refresh
-        if request.force_refresh:
-            try:
-                if website_bot.chroma_client:
-                    collection_name = website_bot.sanitize_collection_name(site_url)
-                    website_bot.chroma_client.delete_collection(name=collection_name)
-                    print(f"🔄 Cleared cache: {collection_name}")
-            except Exception as e:
-                print(f"⚠️ Cache clear warning: {e}")
-        
-        # Get URLs from sitemap or Firecrawl
-        all_urls = website_bot.get_site_urls(site_url)
-        main_pages = website_bot.select_main_pages(all_urls, site_url)
-        
-        print(f"📌 Selected pages to scrape: {main_pages}")
+        response = None
+        for event in scrape_events(request, debug_info):
+            if event["event"] == "result":
+                response = {k: v for k, v in event.items() if k != "event"}
+
+        if not request.debug:
+            result_cache_set(cache_key, response)
         
-        if request.debug:
-            debug_info["pages_found"] = len(all_urls)
-            debug_info["pages_scraped"] = main_pages
+        return response
 
-        all_text = ""
-        all_html = ""
-        all_social = {"Facebook": "", "Instagram": "", "LinkedIn": "", "Twitter / X": ""}
-        logo_url_found = None
-        theme_colors = {}
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error scraping site: {str(e)}")
 
-        # Scrape each page
-        for page in main_pages:
-            try:
-                print(f"\n📄 Processing: {page}")
-                html = website_bot.fetch_page(page)
-                
-                if not html:
-                    print(f"   ⚠️ No HTML content fetched")
-                    continue
-                
-                all_html += " " + html
-
-                # Extract logo (first page only)
-                if not logo_url_found:
-                    logo = website_bot.extract_logo_url(html, page)
-                    if logo:
-                        logo_url_found = logo
-                        print(f"   🖼️ Logo found: {logo}")
-
-                # Extract theme colors
-                if not theme_colors.get("primary_color"):
-                    theme_colors = website_bot.extract_theme_colors(html, page)
-                    if theme_colors.get("primary_color"):
-                        print(f"   🎨 Primary color: {theme_colors['primary_color']}")
-
-                # Extract social links
-                page_social = website_bot.extract_social_links_from_html(html)
-                for k, v in page_social.items():
-                    if v and not all_social[k]:
-                        all_social[k] = v
-                        print(f"   📱 {k}: {v}")
-
-                # Extract text content
-                soup = BeautifulSoup(html, "html.parser")
-                [s.extract() for s in soup(["script", "style", "noscript"])]
-                page_text = website_bot.clean_text(soup.get_text(" ", strip=True))
-                all_text += " " + page_text
-                
-                print(f"   ✅ Extracted {len(page_text)} characters of text")
-                
-            except Exception as e:
-                print(f"   ❌ Error processing page {page}: {e}")
-                continue
 
-        # Clean and chunk text
-        all_text = website_bot.clean_text(all_text)
-        chunks = website_bot.chunk_text(all_text)
-        
-        print(f"\n📊 Total text: {len(all_text)} chars, {len(chunks)} chunks")
-        
-        if request.debug:
-            debug_info["total_text_length"] = len(all_text)
-            debug_info["chunks_count"] = len(chunks)
-            debug_info["text_preview"] = all_text[:1000]
-            debug_info["pin_codes_found"] = re.findall(r'\b\d{6}\b', all_text)
-
-        # Run RAG extraction
-        print("\n🧠 Running RAG extraction...")
-        data = website_bot.rag_extract(chunks, site_url)
-
-        # Ensure data is a dict
-        if not isinstance(data, dict):
-            data = {}
-
-        # Add logo
-        data["Logo"] = logo_url_found or ""
-
-        # Add theme colors
-        data["Theme Colors"] = {
-            "Primary": theme_colors.get("primary_color", ""),
-            "Secondary": theme_colors.get("secondary_color", ""),
-            "Accent": theme_colors.get("accent_color", ""),
-            "Palette": theme_colors.get("color_palette", [])
-        }
+@router.post("/scrape/stream")
+def scrape_stream(request: URLRequest):
+    """
+    Same pipeline as /scrape, streamed as NDJSON: one event per line
+    ("pages", "page", "rag", then "result" or "error").
+    """
+    site_url = request.url
+    
+    if not site_url:
+        raise HTTPException(status_code=400, detail="Missing 'url' parameter")
 
-        # Extract and clean emails
-        try:
-            extracted_emails = website_bot.extract_all_emails(all_text, all_html)
-            existing_emails = data.get("Email", [])
-            if isinstance(existing_emails, str):
-                existing_emails = [existing_emails] if existing_emails else []
-            if not isinstance(existing_emails, list):
-                existing_emails = []
-            all_emails = existing_emails + extracted_emails
-            data["Email"] = website_bot.clean_email_list(all_emails)
-            
-            if request.debug:
-                debug_info["emails_extracted"] = extracted_emails
-                debug_info["emails_final"] = data["Email"]
-        except Exception as e:
-            print(f"❌ Error extracting emails: {e}")
-            data["Email"] = []
+    cache_key = result_cache_key(site_url)
 
-        # Extract and clean phones
-        try:
-            extracted_phones = website_bot.extract_all_phones(all_text)
-            existing_phones = data.get("Phone", [])
-            if isinstance(existing_phones, str):
-                existing_phones = [existing_phones] if existing_phones else []
-            if not isinstance(existing_phones, list):
-                existing_phones = []
-            all_phones = existing_phones + extracted_phones
-            data["Phone"] = website_bot.clean_phone_list(all_phones)
-            
-            if request.debug:
-                debug_info["phones_extracted"] = extracted_phones
-        except Exception as e:
-            print(f"❌ Error extracting phones: {e}")
-            data["Phone"] = []
+    def gen():
+        if request.force_refresh:
+            result_cache_clear(cache_key)
+        elif not request.debug:
+            cached = result_cache_get(cache_key)
+            if cached is not None:
+                print(f"⚡ Result cache hit: {site_url}")
+                yield orjson.dumps({"event": "result", **cached}) + b"\n"
+                return
 
-        # Extract and clean addresses with DEBUG
         try:
-            print("\n🏠 Address extraction debug:")
-            extracted_addresses = website_bot.extract_all_addresses(all_text)
-            print(f"   Raw extracted: {extracted_addresses}")
-            
-            existing_addresses = data.get("Address", [])
-            if isinstance(existing_addresses, str):
-                existing_addresses = [existing_addresses] if existing_addresses else []
-            if not isinstance(existing_addresses, list):
-                existing_addresses = []
-            
-            print(f"   From RAG: {existing_addresses}")
-            
-            all_addresses = existing_addresses + extracted_addresses
-            print(f"   Combined: {all_addresses}")
-            
-            data["Address"] = website_bot.clean_address_list(all_addresses)
-            print(f"   After cleaning: {data['Address']}")
-            
-            if request.debug:
-                debug_info["addresses_from_rag"] = existing_addresses
-                debug_info["addresses_extracted"] = extracted_addresses
-                debug_info["addresses_combined"] = all_addresses
-                debug_info["addresses_final"] = data["Address"]
+            for event in scrape_events(request, {} if request.debug else None):
+                if event["event"] == "result" and not request.debug:
+                    result_cache_set(cache_key, {k: v for k, v in event.items() if k != "event"})
+                yield orjson.dumps(event) + b"\n"
         except Exception as e:
-            print(f"❌ Error extracting addresses: {e}")
             traceback.print_exc()
-            data["Address"] = []
-
-        # Add social links
-        for k, v in all_social.items():
-            if v:
-                data[k] = v
-
-        data["URL"] = site_url
-
-        # Set defaults
-        defaults = {
-            "Business Name": "",
-            "About Us": "",
-            "Main Services": [],
-            "Description": "",
-            "Email": [],
-            "Phone": [],
-            "Address": [],
-            "Facebook": "",
-            "Instagram": "",
-            "LinkedIn": "",
-            "Twitter / X": "",
-            "Logo": "",
-            "Theme Colors": {"Primary": "", "Secondary": "", "Accent": "", "Palette": []},
-            "URL": site_url
-        }
-        
-        for k, v in defaults.items():
-            if k not in data:
-                data[k] = v
-            elif data[k] is None:
-                data[k] = v
-            elif k in ["Email", "Phone", "Address", "Main Services"]:
-                if not isinstance(data[k], list):
-                    data[k] = [data[k]] if data[k] else []
-
-        print(f"\n{'='*50}")
-        print("✅ Scraping completed successfully!")
-        print(f"{'='*50}\n")
-        
-        response = {"success": True, "message": "Scraping Successful", "data": data}
-        
-        if request.debug:
-            response["debug"] = debug_info
-        
-        return response
+            yield orjson.dumps({"event": "error", "detail": f"Error scraping site: {str(e)}"}) + b"\n"
 
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error scraping site: {str(e)}")
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
 
 
 # ================== OTHER ENDPOINTS (UNCHANGED) ==================
@@ -794,16 +998,13 @@ def scrape(request: URLRequest):
 @router.post("/scrape/colors")
 def scrape_colors_only(request: URLRequest):
     """Extract only theme colors from a website."""
-    site_url = request.url.strip()
+    site_url = request.url
     
     if not site_url:
         raise HTTPException(status_code=400, detail="Missing 'url' parameter")
-    
-    if not site_url.startswith("http"):
-        site_url = "https://" + site_url
 
     try:
-        html = website_bot.fetch_page(site_url)
+        html = website_bot.fetch_page(site_url, use_cache=not request.force_refresh)
         
         if not html:
             raise HTTPException(status_code=404, detail="Could not fetch website content")
@@ -835,16 +1036,13 @@ def scrape_colors_only(request: URLRequest):
 @router.post("/scrape/social")
 def scrape_social_only(request: URLRequest):
     """Extract only social media links from a website."""
-    site_url = request.url.strip()
+    site_url = request.url
     
     if not site_url:
         raise HTTPException(status_code=400, detail="Missing 'url' parameter")
-    
-    if not site_url.startswith("http"):
-        site_url = "https://" + site_url
 
     try:
-        html = website_bot.fetch_page(site_url)
+        html = website_bot.fetch_page(site_url, use_cache=not request.force_refresh)
         
         if not html:
             raise HTTPException(status_code=404, detail="Could not fetch website content")
@@ -872,16 +1070,13 @@ def scrape_social_only(request: URLRequest):
 @router.post("/scrape/contacts")
 def scrape_contacts_only(request: URLRequest):
     """Extract only contact information from a website."""
-    site_url = request.url.strip()
+    site_url = request.url
     
     if not site_url:
         raise HTTPException(status_code=400, detail="Missing 'url' parameter")
-    
-    if not site_url.startswith("http"):
-        site_url = "https://" + site_url
 
     try:
-        all_urls = website_bot.get_site_urls(site_url)
+        all_urls = website_bot.get_site_urls(site_url, use_cache=not request.force_refresh)
         pages_to_check = [site_url]
         
         for url in all_urls:
@@ -889,23 +1084,27 @@ def scrape_contacts_only(request: URLRequest):
                 pages_to_check.append(url)
                 break
         
-        all_text = ""
-        all_html = ""
+        text_parts = []
+        html_parts = []
+        contact_text = contact_html = ""
         
-        for page in pages_to_check[:2]:
+        for page, html in website_bot.fetch_pages(pages_to_check[:2], use_cache=not request.force_refresh):
             try:
-                html = website_bot.fetch_page(page)
                 if html:
-                    all_html += " " + html
-                    soup = BeautifulSoup(html, "html.parser")
-                    [s.extract() for s in soup(["script", "style", "noscript"])]
-                    all_text += " " + website_bot.clean_text(soup.get_text(" ", strip=True))
+                    page_text = website_bot.html_to_text(html)
+                    html_parts.append(html)
+                    text_parts.append(page_text)
+                    if website_bot.is_contact_page(page):
+                        contact_text, contact_html = page_text, html
             except:
                 continue
         
-        emails = website_bot.extract_all_emails(all_text, all_html)
-        phones = website_bot.extract_all_phones(all_text)
-        addresses = website_bot.extract_all_addresses(all_text)
+        all_text = " ".join(text_parts)
+        all_html = " ".join(html_parts)
+        # Contact page first; both pages only if it has none
+        emails, phones, addresses = website_bot.extract_fallback_contacts(
+            all_text, all_html, contact_text, contact_html
+        )
         
         return {
             "success": True,
@@ -955,6 +1154,7 @@ def api_root():
         "endpoints": {
             "scraping": {
                 "POST /api/scrape": "Full website scrape (supports force_refresh, debug)",
+                "POST /api/scrape/stream": "Full website scrape streamed as NDJSON progress events",
                 "POST /api/scrape/colors": "Extract theme colors only",
                 "POST /api/scrape/social": "Extract social links only",
                 "POST /api/scrape/contacts": "Extract contacts only"
@@ -1007,4 +1207,12 @@ if __name__ == "__main__":
     print("   GET  /api/cache/list - List cached collections")
     print("   POST /api/cache/clear-all - Clear all cache")
     print("\n")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+        timeout_keep_alive=30,
+    )
\ No newline at end of file
@@ -5,25 +5,86 @@ Best multi-office extraction, perfect contacts, social links, and theme colors
 Includes: Cloudflare email protection decoder, duplicate removal, color extraction
 """
 
+import io
 import os
 import re
+import sys
 import time
 import json
+import hashlib
+import functools
+import itertools
+import sqlite3
+import shutil
+import uuid
 import urllib.parse
+import html as html_lib
 import colorsys
 from collections import Counter
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import concurrent.futures
+import numpy as np
+import threading
+import lxml.etree
+import lxml.html
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """Parse JSON from str/bytes (orjson when installed)."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def json_dumps(obj, indent=False):
+    """Serialize to a JSON str, keeping non-ASCII text as-is (orjson when installed)."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
 
 # ---------------- Config ----------------
 load_dotenv(override=True)
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
 FIRECRAWL_KEY = os.getenv("FIRECRAWL_API_KEY")
+FIRECRAWL_WAIT_MS = int(os.getenv("FIRECRAWL_WAIT_MS", "0"))  # extra render wait for JS-heavy sites
 
-CHUNK_SIZE = 180
+CHUNK_SIZE = 180  # words, used when tiktoken is unavailable
 CHUNK_OVERLAP = 30
+CHUNK_TOKENS = 256  # tokens per chunk when tiktoken is available
+CHUNK_TOKEN_OVERLAP = 32
+CHUNK_ENCODING = "cl100k_base"  # tokenizer of EMBEDDING_MODEL
+# tiktoken downloads its BPE file on first use with no timeout; wait at most this long
+CHUNK_ENCODER_TIMEOUT = float(os.getenv("CHUNK_ENCODER_TIMEOUT", "10"))
+FETCH_WORKERS = 4
+SITEMAP_WORKERS = 8
+# Worker processes for CLI page parsing (0 = parse on the fetch threads)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+SITEMAP_MAX_BYTES = 32 * 1024 * 1024  # read at most this much of any one sitemap
+EMBED_BATCH = 512  # inputs per embeddings request (API allows up to 2048)
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536  # output size of EMBEDDING_MODEL
+CHAT_MODEL = "gpt-5-nano"
+RAG_TOP_K = 6
+MAX_CHUNKS = 128  # most chunks embedded per site; only RAG_TOP_K reach the prompt
+MAX_TEXT_CHARS = 200_000  # page text kept per site; more than MAX_CHUNKS chunks' worth
+RAG_QUERY = "company name, about us, services, contact information, email, phone, office address, location"
+# Per-site chunk counts are small, so retrieval runs in memory by default;
+# set RAG_USE_QDRANT=1 to index and search through Qdrant instead.
+RAG_USE_QDRANT = os.getenv("RAG_USE_QDRANT", "").lower() in ("1", "true", "yes")
+# Set USE_SELECTOLAX=1 (and pip install selectolax) for faster page-text extraction
+USE_SELECTOLAX = os.getenv("USE_SELECTOLAX", "").lower() in ("1", "true", "yes")
+# Set USE_LOCAL_EMBEDDINGS=1 (and pip install sentence-transformers) to embed
+# chunks on this machine instead of calling the OpenAI embeddings API
+USE_LOCAL_EMBEDDINGS = os.getenv("USE_LOCAL_EMBEDDINGS", "").lower() in ("1", "true", "yes")
+LOCAL_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+LOCAL_EMBEDDING_DIM = 384  # output size of LOCAL_EMBEDDING_MODEL
 
 if not OPENAI_KEY:
     raise SystemExit("❌ OPENAI_API_KEY not found in .env")
@@ -31,27 +92,101 @@ if not FIRECRAWL_KEY:
     print("⚠️ FIRECRAWL_API_KEY not found, Firecrawl fallback disabled")
 
 # ---------------- Qdrant & OpenAI ----------------
-try:
-    from qdrant_client import QdrantClient
-    from qdrant_client.models import Distance, VectorParams, PointStruct
-    from openai import OpenAI
-except Exception as e:
-    print("Import error:", e)
-    raise SystemExit(f"Error importing modules: {e}")
-
+# Both SDKs are slow to import, so they are loaded only when actually used;
+# importing this module for its helpers stays cheap.
 QDRANT_HOST = os.getenv("QDRANT_HOST")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 
-# Initialize Qdrant client
-try:
-    qdrant_client = QdrantClient(url=QDRANT_HOST, api_key=QDRANT_API_KEY)
-    print("✅ Qdrant client initialized")
-except Exception as err:
-    print("⚠️ Could not initialize Qdrant client.")
-    print("Qdrant error:", str(err))
-    qdrant_client = None
+# Initialize Qdrant client (only when Qdrant retrieval is enabled)
+qdrant_client = None
+if RAG_USE_QDRANT:
+    try:
+        from qdrant_client import QdrantClient
+        from qdrant_client.models import (
+            Distance, VectorParams, PointStruct,
+            ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+            Filter, HasIdCondition
+        )
+        qdrant_client = QdrantClient(url=QDRANT_HOST, api_key=QDRANT_API_KEY)
+        print("✅ Qdrant client initialized")
+    except Exception as err:
+        print("⚠️ Could not initialize Qdrant client.")
+        print("Qdrant error:", str(err))
+        qdrant_client = None
 
-openai_client = OpenAI(api_key=OPENAI_KEY)
+
+@functools.cache
+def get_openai_client():
+    """Shared OpenAI client, created on first use."""
+    from openai import OpenAI
+    return OpenAI(api_key=OPENAI_KEY)
+
+# Optional local embedding model; torch is slow to import, so the package is
+# only located here and the model itself is loaded on first use
+if USE_LOCAL_EMBEDDINGS:
+    import importlib.util
+    if importlib.util.find_spec("sentence_transformers"):
+        EMBEDDING_MODEL, EMBEDDING_DIM = LOCAL_EMBEDDING_MODEL, LOCAL_EMBEDDING_DIM
+    else:
+        print("⚠️ sentence-transformers not available, using OpenAI embeddings")
+        USE_LOCAL_EMBEDDINGS = False
+
+
+@functools.cache
+def get_local_embedder():
+    """Shared sentence-transformers model, loaded on first use."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(LOCAL_EMBEDDING_MODEL)
+
+
+def embed_texts(texts):
+    """Embedding vectors for `texts`, from the local model when enabled, else the OpenAI API."""
+    if USE_LOCAL_EMBEDDINGS:
+        # Unit-length like OpenAI's vectors, so cosine scores stay comparable
+        return get_local_embedder().encode(texts, normalize_embeddings=True).tolist()
+    resp = get_openai_client().embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    return [item.embedding for item in resp.data]
+
+# Optional selectolax parser for html_to_text; lxml is used when unavailable
+SelectolaxParser = None
+if USE_SELECTOLAX:
+    try:
+        # Lexbor backend (selectolax >= 0.3); 1.0 removed the old Modest parser
+        from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    except Exception:
+        try:
+            from selectolax.parser import HTMLParser as SelectolaxParser
+        except Exception as err:
+            print("⚠️ selectolax not available, falling back to lxml text extraction:", err)
+
+# ---------------- HTTP Session ----------------
+# One pooled session so repeated requests to the same host reuse the
+# TCP connection and TLS session instead of handshaking every time.
+SESSION = requests.Session()
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+})
+# Retry idempotent requests on connection errors / gateway 5xx; POSTs to
+# Firecrawl are billed, so they are never retried automatically.
+_http_retry = Retry(
+    total=2,
+    backoff_factor=0.3,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(["GET", "HEAD"]),
+    raise_on_status=False,
+)
+# pool_connections is the number of hosts kept warm (site, Firecrawl, CDNs);
+# pool_maxsize covers the widest fan-out to a single host (sitemap shards)
+# with headroom for concurrent API requests sharing this session.
+_http_adapter = HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=max(FETCH_WORKERS, SITEMAP_WORKERS) * 2,
+    max_retries=_http_retry,
+)
+SESSION.mount("https://", _http_adapter)
+SESSION.mount("http://", _http_adapter)
 
 
 # ---------------- Helper Functions ----------------
@@ -60,12 +195,144 @@ def clean_text(t):
     if not t:
         return ""
     try:
-        return re.sub(r"\s+", " ", str(t)).strip()
+        # str.split() collapses the same whitespace set as \s+ and runs in C
+        return " ".join(str(t).split())
     except Exception:
         return str(t).strip()
 
 
+# ---------------- Contact Patterns (compiled once) ----------------
+# Word-boundary anchored and length-capped (RFC 5321 limits) so long runs
+# without an "@" are rejected without rescanning from every character
+_EMAIL_RE = re.compile(r'\b[a-zA-Z0-9._+-]{1,64}@[a-zA-Z0-9.-]{1,255}\.[a-zA-Z]{2,24}\b')
+_EMAIL_VALID_RE = re.compile(r'^[a-zA-Z0-9._+%-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_NON_HEX_RE = re.compile(r'[^a-fA-F0-9]')
+_CF_HREF_RE = re.compile(r'email-protection[#?]([a-fA-F0-9]+)')
+_CF_ATTR_RE = re.compile(r'data-cfemail=["\']([a-fA-F0-9]+)["\']')
+_NON_DIGIT_RE = re.compile(r'\D')
+
+_PHONE_PATTERNS = [
+    re.compile(r'(?<!\d)\+?\d[\d\s().-]{8,15}'),
+    re.compile(r'\b\d{3}[\s.-]\d{3}[\s.-]\d{4}\b'),
+    re.compile(r'\+\d{1,3}\s?\d{4,5}\s?\d{4,6}\b'),
+]
+
+_DIGITS5_RE = re.compile(r'\d{5}')
+_DIGITS6_RE = re.compile(r'\d{6}')
+_PIN_RE = re.compile(r'\b\d{6}\b')
+_ZIP_RE = re.compile(r'\b\d{5}\b')
+_ZIP_FULL_RE = re.compile(r'\b\d{5}(?:-\d{4})?\b')
+_DIGIT_RE = re.compile(r'\d')
+# mailto:/tel: link targets; these are exact contact details, so the broad
+# regex scans only run when a page has none
+_MAILTO_HREF_RE = re.compile(r'href\s*=\s*["\']\s*mailto:([^"\'?]+)', re.IGNORECASE)
+_TEL_HREF_RE = re.compile(r'href\s*=\s*["\']\s*tel:(?://)?([^"\'?;]+)', re.IGNORECASE)
+_EMAIL_ARTIFACT_RE = re.compile(r'$$email.*?$$')
+_ADDR_NORMALIZE_RE = re.compile(r'[,.\-\s]+')
+
+_ADDRESS_START_PATTERNS = [
+    re.compile(r'\b(\d{1,5}[,\s])', re.IGNORECASE),  # Starts with number
+    re.compile(r'(?:Address|Location|Office)[:\s]+', re.IGNORECASE),  # After label
+    re.compile(r'(?:\.\s+|\n\s*)(\d{1,5}[,\s])', re.IGNORECASE),  # After sentence, starts with number
+]
+_ADDRESS_NUMBER_START_RE = re.compile(r'\b(\d{1,5})[,\s]+[A-Za-z]')
+
+_ADDR_INDIAN_RE = re.compile(
+    r'(\b\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/\'\"]{1,200}?(?:Gujarat|Maharashtra|Delhi|Karnataka|Rajasthan|Tamil Nadu|India)[,\s]{0,5}\d{6})\b',
+    re.IGNORECASE
+)
+_ADDR_BUILDING_RE = re.compile(
+    r'(\b\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/\'\"]{1,200}?(?:Tower|Building|Floor|Complex|Plaza|Block|Office)[A-Za-z0-9\s,.\-/\'\"]{1,200}?\d{6})\b',
+    re.IGNORECASE
+)
+_ADDR_LABEL_RE = re.compile(
+    r'\b(?:Address|Location|Office|Headquarters|Contact)[:\s]{1,5}(\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/\'\"]{15,180}?\d{6})\b',
+    re.IGNORECASE
+)
+_ADDR_GENERIC_RE = re.compile(r'(\b\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/\'\"]{20,180}?\b\d{6})\b')
+_ADDR_US_RE = re.compile(r'(\b\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-]{15,100}\s[A-Z]{2}\s*\d{5}(?:-\d{4})?)\b')
+
+# Substring filters for address candidates, matched against lowercased text.
+# Each list is fused into one alternation below so a candidate is scanned once.
+
+# Text that marks a candidate as page chrome rather than an address
+_ADDRESS_BLACKLIST = (
+    'copyright', 'reserved', 'privacy', 'terms', 'cookie',
+    'facebook', 'twitter', 'linkedin', 'instagram', '@',
+    'click', 'subscribe', 'newsletter', 'loading'
+)
+
+# Words that should NOT appear in physical addresses
+_ADDRESS_INVALID_WORDS = (
+    'association', 'college', 'university', 'school', 'hospital',
+    'professor', 'doctor', 'training', 'faculty', 'speaker',
+    'director', 'president', 'fellow', 'textbook', 'published',
+    'articles', 'teaches', 'courses', 'medicine', 'pediatrics',
+    'clinical', 'copyright', 'reserved', 'privacy', 'terms',
+    'cookie', 'disclaimer', 'subscribe', 'newsletter', 'download',
+    'facebook', 'twitter', 'linkedin', 'instagram', 'youtube'
+)
+
+# Address indicator keywords (positive signals)
+_ADDRESS_KEYWORDS = (
+    # Buildings/Structures
+    'floor', 'tower', 'block', 'building', 'complex', 'plaza',
+    'mall', 'center', 'centre', 'park', 'house', 'office',
+    'suite', 'unit', 'shop', 'flat', 'plot', 'no.', 'no ',
+    # Indian specific
+    'nagar', 'colony', 'society', 'chowk', 'marg', 'road', 'rd',
+    'gali', 'sector', 'phase', 'vihar', 'enclave', 'garden',
+    'bazar', 'bazaar', 'market', 'near', 'opp', 'opposite',
+    'behind', 'beside', 'cross', 'main', 'layout', 'extension',
+    'bh.', 'nr.', 'nr ', 'c.t.m', 'ctm',
+    # US/Western
+    'street', 'st.', 'st ', 'avenue', 'ave', 'drive', 'dr.',
+    'lane', 'ln', 'boulevard', 'blvd', 'highway', 'hwy',
+    'court', 'ct', 'way', 'place', 'pl', 'square', 'sq',
+    'terrace', 'parkway', 'circle', 'route'
+)
+
+# Location indicators (cities/states/countries)
+_ADDRESS_LOCATIONS = (
+    # Indian cities
+    'ahmedabad', 'mumbai', 'delhi', 'bangalore', 'bengaluru',
+    'chennai', 'hyderabad', 'pune', 'kolkata', 'jaipur',
+    'surat', 'vadodara', 'gandhinagar', 'rajkot', 'indore',
+    'lucknow', 'noida', 'gurgaon', 'gurugram', 'chandigarh',
+    'amraiwadi', 'bopal', 'satellite', 'navrangpura',
+    # Indian states
+    'gujarat', 'maharashtra', 'karnataka', 'tamil nadu',
+    'telangana', 'rajasthan', 'uttar pradesh', 'haryana',
+    'punjab', 'west bengal', 'madhya pradesh', 'kerala',
+    # Countries
+    'india', 'usa', 'uk', 'canada', 'australia'
+)
+
+
+def _substring_re(words):
+    """One pattern that matches wherever any of `words` occurs."""
+    return re.compile("|".join(map(re.escape, words)))
+
+
+_ADDRESS_BLACKLIST_RE = _substring_re(_ADDRESS_BLACKLIST)
+_ADDRESS_INVALID_WORD_RE = _substring_re(_ADDRESS_INVALID_WORDS)
+_ADDRESS_KEYWORD_RE = _substring_re(_ADDRESS_KEYWORDS)
+_ADDRESS_LOCATION_RE = _substring_re(_ADDRESS_LOCATIONS)
+
+
+# ---------------- Text / URL Patterns (compiled once) ----------------
+_MULTI_SLASH_RE = re.compile(r'/+')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_URL_SCHEME_RE = re.compile(r'^https?://')
+_WWW_PREFIX_RE = re.compile(r'^www\.')
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]')
+_MULTI_UNDERSCORE_RE = re.compile(r'_+')
+
+
 # ---------------- Cloudflare Email Protection Decoder ----------------
+# Cloudflare-obfuscated emails only ever live in these tags
+_CF_STRAINER = SoupStrainer(["span", "a", "script"])
+
 def decode_cloudflare_email(encoded_string: str) -> str:
     """
     Decode Cloudflare protected email addresses.
@@ -76,7 +343,7 @@ def decode_cloudflare_email(encoded_string: str) -> str:
             return ""
         
         # Remove any non-hex characters
-        encoded_string = re.sub(r'[^a-fA-F0-9]', '', str(encoded_string))
+        encoded_string = _NON_HEX_RE.sub('', str(encoded_string))
         
         if len(encoded_string) < 4:
             return ""
@@ -99,7 +366,7 @@ def extract_cloudflare_emails(html: str) -> list:
         return emails
     
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml", parse_only=_CF_STRAINER)
         
         # Method 1: Look for Cloudflare protected email spans
         for span in soup.find_all("span", class_="__cf_email__"):
@@ -127,7 +394,7 @@ def extract_cloudflare_emails(html: str) -> list:
                     emails.append(decoded)
             elif "/cdn-cgi/l/email-protection" in href:
                 try:
-                    match = re.search(r'email-protection[#?]([a-fA-F0-9]+)', href)
+                    match = _CF_HREF_RE.search(href)
                     if match:
                         decoded = decode_cloudflare_email(match.group(1))
                         if decoded and "@" in decoded and is_valid_email(decoded):
@@ -139,7 +406,7 @@ def extract_cloudflare_emails(html: str) -> list:
         for script in soup.find_all("script"):
             try:
                 script_text = script.get_text()
-                cf_matches = re.findall(r'data-cfemail=["\']([a-fA-F0-9]+)["\']', script_text)
+                cf_matches = _CF_ATTR_RE.findall(script_text)
                 for match in cf_matches:
                     decoded = decode_cloudflare_email(match)
                     if decoded and "@" in decoded and is_valid_email(decoded):
@@ -149,7 +416,8 @@ def extract_cloudflare_emails(html: str) -> list:
     except Exception:
         pass
     
-    return list(set(emails))
+    # First-seen order, so results are stable run to run
+    return list(dict.fromkeys(emails))
 
 
 def is_valid_email(email: str) -> bool:
@@ -204,8 +472,7 @@ def is_valid_email(email: str) -> bool:
             return False
         
         # Basic email validation regex
-        email_pattern = r'^[a-zA-Z0-9._+%-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, email):
+        if not _EMAIL_VALID_RE.match(email):
             return False
         
         # Check domain part has at least one dot
@@ -261,7 +528,7 @@ def clean_phone_list(phones: list) -> list:
         try:
             if isinstance(phone, str):
                 phone = phone.strip()
-                digits = re.sub(r'\D', '', phone)
+                digits = _NON_DIGIT_RE.sub('', phone)
                 
                 if len(digits) >= 10 and len(digits) <= 15 and digits not in seen_digits:
                     cleaned.append(phone)
@@ -287,7 +554,7 @@ def normalize_social_url(url: str) -> str:
 
         parsed = urllib.parse.urlparse(url)
 
-        clean_path = re.sub(r'/+', '/', parsed.path)
+        clean_path = _MULTI_SLASH_RE.sub('/', parsed.path)
 
         if clean_path != "/" and clean_path.endswith("/"):
             clean_path = clean_path.rstrip("/")
@@ -304,22 +571,140 @@ def normalize_social_url(url: str) -> str:
         return url
 
 
+# ---------------- Disk Cache Files ----------------
+# Expired files are swept from a cache directory at most this often per process
+CACHE_PRUNE_INTERVAL = int(os.getenv("CACHE_PRUNE_INTERVAL", "3600"))
+_last_prune = {}
+_prune_lock = threading.Lock()
+
+
+def write_file_atomic(path, text):
+    """Write `text` to `path` via a temp file, so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def prune_cache_dir(directory, ttl):
+    """Delete files under `directory` older than `ttl` seconds (throttled to CACHE_PRUNE_INTERVAL)."""
+    now = time.time()
+    with _prune_lock:
+        if now - _last_prune.get(directory, 0) < CACHE_PRUNE_INTERVAL:
+            return
+        _last_prune[directory] = now
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if now - os.path.getmtime(path) > ttl:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+# ---------------- Page Cache ----------------
+# Fetched HTML (and each site's discovered URL list) is reused from disk for
+# HTML_CACHE_TTL seconds, so repeat scrapes skip the network and Firecrawl (0 disables).
+# Files are grouped per host so one site's pages can be cleared on their own.
+HTML_CACHE_DIR = os.getenv("HTML_CACHE_DIR", "./cache/html")
+HTML_CACHE_TTL = int(os.getenv("HTML_CACHE_TTL", "86400"))
+
+
+def html_cache_site_dir(url):
+    """Cache directory for the host of `url` (case and a leading www. ignored)."""
+    host = urllib.parse.urlsplit(url).netloc.lower().removeprefix("www.")
+    return os.path.join(HTML_CACHE_DIR, hashlib.sha256(host.encode("utf-8")).hexdigest()[:32])
+
+
+def html_cache_path(url, kind="html"):
+    """Cache file for `url`: kind "html" holds a page, "urls" a site's URL list."""
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(html_cache_site_dir(url), f"{name}.{kind}")
+
+
+def html_cache_get(url, kind="html"):
+    """Return the cached text for `url`, or None if missing, expired or caching is off."""
+    if HTML_CACHE_TTL <= 0:
+        return None
+    path = html_cache_path(url, kind)
+    try:
+        if time.time() - os.path.getmtime(path) > HTML_CACHE_TTL:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except Exception:
+        return None
+
+
+def html_cache_put(url, text, kind="html"):
+    """Store `text` for `url`; written to a temp file first so readers never see a partial file."""
+    if HTML_CACHE_TTL <= 0 or not text:
+        return
+    try:
+        write_file_atomic(html_cache_path(url, kind), text)
+        prune_cache_dir(HTML_CACHE_DIR, HTML_CACHE_TTL)
+    except Exception as e:
+        print(f"⚠️ HTML cache write error: {e}")
+
+
+def html_cache_clear(site_url=None):
+    """Delete the cached pages and URL list for the host of `site_url`, or everything."""
+    shutil.rmtree(html_cache_site_dir(site_url) if site_url else HTML_CACHE_DIR, ignore_errors=True)
+
+
 # ---------------- Fast Requests + Firecrawl Fetch ----------------
-def fetch_page(url: str) -> str:
+# lxml parsers are not thread-safe, so each fetch worker keeps its own
+_parser_local = threading.local()
+
+
+def html_to_text(html: str) -> str:
+    """
+    Visible document text, parsed with selectolax when USE_SELECTOLAX is
+    set, otherwise with a reused per-thread lxml parser.
+    <script>/<style>/<noscript> are dropped from the tree in one pass and
+    comments never make it in, so there is no soup to build or .extract().
+    """
+    if not html:
+        return ""
+    if SelectolaxParser is not None:
+        try:
+            tree = SelectolaxParser(html)
+            tree.strip_tags(["script", "style", "noscript"])
+            return " ".join(tree.root.text(separator=" ").split()) if tree.root else ""
+        except Exception:
+            pass
+    parser = getattr(_parser_local, "parser", None)
+    if parser is None:
+        parser = _parser_local.parser = lxml.html.HTMLParser(
+            encoding="utf-8", recover=True, remove_comments=True, collect_ids=False
+        )
+    try:
+        doc = lxml.html.document_fromstring(html.encode("utf-8", "replace"), parser=parser)
+        lxml.etree.strip_elements(doc, "script", "style", "noscript", with_tail=False)
+        return " ".join(" ".join(doc.itertext()).split())
+    except Exception:
+        return ""
+
+
+def fetch_page(url: str, use_cache: bool = True) -> str:
     """
     First try Requests.
     If content is too small or blocked, try Firecrawl with JS rendering.
+    Pages fetched within HTML_CACHE_TTL are served from disk unless use_cache is False.
     """
+    if use_cache:
+        cached = html_cache_get(url)
+        if cached is not None:
+            print(f"   ⚡ HTML cache hit: {url}")
+            return cached
+
     html = ""
     
     # Try regular requests first
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        }
-        r = requests.get(url, headers=headers, timeout=20)
+        r = SESSION.get(url, timeout=20)
         if r.status_code == 200:
             html = r.text
     except Exception:
@@ -330,8 +715,7 @@ def fetch_page(url: str) -> str:
     has_meaningful_content = False
     if html:
         # Check for common signs of JS-rendered content
-        soup = BeautifulSoup(html, "html.parser")
-        text_content = soup.get_text(" ", strip=True)
+        text_content = html_to_text(html)
         
         # If text is too short OR contains Next.js indicators, content is likely JS-rendered
         is_nextjs = "__next" in html or "self.__next_f" in html or "_next/static" in html
@@ -356,11 +740,17 @@ def fetch_page(url: str) -> str:
             payload = {
                 "url": url,
                 "formats": ["html"],
-                "waitFor": 3000,  # Wait 3 seconds for JS to render
-                "timeout": 30000
+                "timeout": 30000,
+                # Inline data: images can be megabytes of base64 in the HTML we
+                # download, cache and parse; Firecrawl swaps them for a placeholder
+                "removeBase64Images": True
             }
+            # Firecrawl already waits for the page to load; a fixed extra
+            # delay is opt-in for sites that render late
+            if FIRECRAWL_WAIT_MS:
+                payload["waitFor"] = FIRECRAWL_WAIT_MS
 
-            fc = requests.post(fc_url, json=payload, headers=headers, timeout=60)
+            fc = SESSION.post(fc_url, json=payload, headers=headers, timeout=60)
             fc_data = fc.json()
             
             if fc_data.get("success"):
@@ -371,12 +761,147 @@ def fetch_page(url: str) -> str:
         except Exception as e:
             print(f"   ⚠️ Firecrawl error: {e}")
 
-    return html if html and len(html) > 200 else ""
+    html = html if html and len(html) > 200 else ""
+    html_cache_put(url, html)
+    return html
+
+
+def fetch_pages(urls, max_workers=FETCH_WORKERS, process=None, use_cache=True):
+    """
+    Fetch several pages concurrently.
+    Yields (url, html) pairs in the same order as `urls`, as soon as each is ready.
+    Duplicate URLs are only fetched once.
+    If `process(url, html)` is given it runs on the worker thread right after the
+    fetch, and its return value is yielded in place of the html.
+    """
+    urls = list(urls)
+    if not urls:
+        return
+
+    def _fetch(url):
+        try:
+            html = fetch_page(url, use_cache=use_cache)
+        except Exception as e:
+            print(f"   ⚠️ Fetch error for {url}: {e}")
+            html = ""
+        return process(url, html) if process else html
+
+    # Each distinct URL is dispatched once; repeats reuse the same result
+    unique = list(dict.fromkeys(urls))
+    workers = max(1, min(max_workers, len(unique)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as exe:
+        futures = {url: exe.submit(_fetch, url) for url in unique}
+        for url in urls:
+            yield url, futures[url].result()
+
+# ---------------- Social Patterns ----------------
+# Social media URL patterns (expanded)
+_SOCIAL_PATTERNS = {
+    "Facebook": [
+        "facebook.com", "fb.com", "fb.me", 
+        "m.facebook.com", "www.facebook.com",
+        "business.facebook.com"
+    ],
+    "Instagram": [
+        "instagram.com", "instagr.am", 
+        "www.instagram.com", "m.instagram.com"
+    ],
+    "LinkedIn": [
+        "linkedin.com", "www.linkedin.com", 
+        "in.linkedin.com", "lnkd.in"
+    ],
+    "Twitter / X": [
+        "twitter.com", "x.com", "www.twitter.com", 
+        "mobile.twitter.com", "www.x.com"
+    ],
+    "YouTube": [
+        "youtube.com", "youtu.be", "www.youtube.com",
+        "m.youtube.com"
+    ],
+    "Pinterest": [
+        "pinterest.com", "pin.it", "www.pinterest.com"
+    ],
+    "TikTok": [
+        "tiktok.com", "www.tiktok.com", "vm.tiktok.com"
+    ]
+}
+
+# domain -> (platform, priority); earlier patterns in a platform's list win
+_SOCIAL_DOMAIN_RANK = {
+    pattern: (platform, rank)
+    for platform, patterns in _SOCIAL_PATTERNS.items()
+    for rank, pattern in enumerate(patterns)
+}
+# Domains only count as whole host labels: "x.com" must not match inside
+# "netflix.com", nor "fb.me" inside "fb.menu"
+_HOST_START = r'(?<![\w-])'
+_HOST_END = r'(?![\w-])'
+# Full URL whose host is a given domain (or a subdomain of it), for
+# onclick="window.open('...')" handlers
+_ONCLICK_URL_RES = {
+    pattern: re.compile(
+        r'(https?://(?:[\w-]+\.)*' + re.escape(pattern) + _HOST_END + r'[^\s\'"<>]*)'
+    )
+    for pattern in _SOCIAL_DOMAIN_RANK
+}
+# Any known social domain, longest first so "m.facebook.com" wins over "facebook.com"
+_SOCIAL_DOMAIN_RE = re.compile(
+    _HOST_START + "(?:"
+    + "|".join(re.escape(d) for d in sorted(_SOCIAL_DOMAIN_RANK, key=len, reverse=True))
+    + ")" + _HOST_END
+)
+# Longest domains first so e.g. "instagram.com" is tried before "instagr.am"
+_SOCIAL_URL_RE = re.compile(
+    r'https?://(?:www\.)?('
+    + "|".join(re.escape(d) for d in sorted(_SOCIAL_DOMAIN_RANK, key=len, reverse=True))
+    + r')' + _HOST_END + r'[^\s\'"<>)}]+',
+    re.IGNORECASE
+)
+
 
 # ---------------- Enhanced Social Links Extraction ----------------
-def extract_social_links_from_html(html):
+_MAIN_SOCIAL_KEYS = ("Facebook", "Instagram", "LinkedIn", "Twitter / X")
+# href of an <a> tag: double-quoted, single-quoted or bare (not data-href etc.)
+_A_HREF_RE = re.compile(
+    r'<a\s[^>]*?(?<![\w-])href\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))',
+    re.IGNORECASE
+)
+# Regions the DOM never turns into <a> elements: comments and the raw-text
+# contents of script/style/textarea/title (unterminated ones run to the end).
+# Blanked out before the href scan so commented-out or scripted markup can't
+# shadow the live links.
+_HREF_SCAN_SKIP_RE = re.compile(
+    r'<!--.*?(?:-->|\Z)|<(script|style|textarea|title)\b.*?(?:</\1\s*>|\Z)',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def _social_platforms(text_lower):
+    """Platforms whose domains occur in an already-lowercased string, in order of appearance."""
+    return dict.fromkeys(_SOCIAL_DOMAIN_RANK[m.group(0)][0] for m in _SOCIAL_DOMAIN_RE.finditer(text_lower))
+
+
+def _social_from_href(href, social):
+    """Fill still-empty platforms in `social` from a direct profile link."""
+    href = href.strip()
+    href_lower = href.lower()
+    
+    # Skip empty or javascript links, share/sharer links and non-URLs
+    if not href or href.startswith("javascript:") or href == "#":
+        return
+    if "share" in href_lower or not (href.startswith("http") or href.startswith("//")):
+        return
+    
+    for platform in _social_platforms(href_lower):
+        if not social[platform]:  # Only if not already found
+            raw = href if href.startswith("http") else "https:" + href
+            social[platform] = normalize_social_url(raw)
+
+
+def extract_social_links_from_html(html, soup=None):
     """
     Enhanced social media link extraction with multiple detection methods.
+    Pass `soup` to reuse a tree the caller already parsed from `html`.
     """
     social = {
         "Facebook": "",
@@ -391,96 +916,68 @@ def extract_social_links_from_html(html):
     if not html:
         return {k: social[k] for k in ["Facebook", "Instagram", "LinkedIn", "Twitter / X"]}
     
+    # Fast path: scan <a href> attributes with a regex; skip the DOM if that
+    # already yields all four platforms we return
+    hrefs_scanned = False
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        
-        # Social media URL patterns (expanded)
-        social_patterns = {
-            "Facebook": [
-                "facebook.com", "fb.com", "fb.me", 
-                "m.facebook.com", "www.facebook.com",
-                "business.facebook.com"
-            ],
-            "Instagram": [
-                "instagram.com", "instagr.am", 
-                "www.instagram.com", "m.instagram.com"
-            ],
-            "LinkedIn": [
-                "linkedin.com", "www.linkedin.com", 
-                "in.linkedin.com", "lnkd.in"
-            ],
-            "Twitter / X": [
-                "twitter.com", "x.com", "www.twitter.com", 
-                "mobile.twitter.com", "www.x.com"
-            ],
-            "YouTube": [
-                "youtube.com", "youtu.be", "www.youtube.com",
-                "m.youtube.com"
-            ],
-            "Pinterest": [
-                "pinterest.com", "pin.it", "www.pinterest.com"
-            ],
-            "TikTok": [
-                "tiktok.com", "www.tiktok.com", "vm.tiktok.com"
-            ]
-        }
+        for match in _A_HREF_RE.finditer(_HREF_SCAN_SKIP_RE.sub(" ", html)):
+            href = match.group(1) or match.group(2) or match.group(3) or ""
+            _social_from_href(html_lib.unescape(href), social)
+            if all(social[k] for k in _MAIN_SOCIAL_KEYS):
+                return {k: social[k] for k in _MAIN_SOCIAL_KEYS}
+        hrefs_scanned = True
+    except Exception:
+        pass
+    
+    try:
+        if soup is None:
+            soup = BeautifulSoup(html, "lxml")
         
-        # Method 1: Standard <a> tag hrefs
-        for a in soup.find_all("a", href=True):
-            href = str(a.get("href", "")).strip()
-            href_lower = href.lower()
-            
-            # Skip empty or javascript links
-            if not href or href.startswith("javascript:") or href == "#":
-                continue
-            
-            for platform, patterns in social_patterns.items():
-                if not social[platform]:  # Only if not already found
-                    for pattern in patterns:
-                        if pattern in href_lower:
-                            # Skip share/sharer links
-                            if "share" in href_lower or "sharer" in href_lower:
-                                continue
-                            # Validate it's a proper URL
-                            if href.startswith("http") or href.startswith("//"):
-                                # social[platform] = href if href.startswith("http") else "https:" + href
-                                raw = href if href.startswith("http") else "https:" + href
-                                social[platform] = normalize_social_url(raw)
-                                break
+        social_patterns = _SOCIAL_PATTERNS
+        
+        # Method 1: Standard <a> tag hrefs, only if the regex pass above
+        # didn't already cover them (stop once every returned platform is set)
+        if not hrefs_scanned:
+            for a in soup.find_all("a", href=True):
+                _social_from_href(str(a.get("href", "")), social)
+                if all(social[k] for k in _MAIN_SOCIAL_KEYS):
+                    break
         
-        # Method 2: Check data attributes (data-href, data-url, etc.)
+        # Method 2: Check data attributes (data-href, data-url, etc.), one
+        # domain alternation per value instead of a substring test per pattern
         data_attrs = ["data-href", "data-url", "data-link", "data-social"]
         for attr in data_attrs:
+            if all(social[k] for k in _MAIN_SOCIAL_KEYS):
+                break
             for elem in soup.find_all(attrs={attr: True}):
-                href = str(elem.get(attr, "")).lower()
-                original_href = elem.get(attr, "")
-                for platform, patterns in social_patterns.items():
+                original_href = str(elem.get(attr, ""))
+                if not (original_href.startswith("http") or original_href.startswith("//")):
+                    continue
+                raw = original_href if original_href.startswith("http") else "https:" + original_href
+                for platform in _social_platforms(original_href.lower()):
                     if not social[platform]:
-                        for pattern in patterns:
-                            if pattern in href:
-                                if original_href.startswith("http") or original_href.startswith("//"):
-                                    raw = original_href if original_href.startswith("http") else "https:" + original_href
-                                    social[platform] = normalize_social_url(raw)
-                                break
+                        social[platform] = normalize_social_url(raw)
         
         # Method 3: Check aria-label and title attributes on links
+        platform_keywords = {
+            "Facebook": ["facebook", "fb"],
+            "Instagram": ["instagram", "insta"],
+            "LinkedIn": ["linkedin"],
+            "Twitter / X": ["twitter", "tweet", " x "],
+            "YouTube": ["youtube", "yt"],
+            "Pinterest": ["pinterest", "pin"],
+            "TikTok": ["tiktok", "tik tok"]
+        }
         for a in soup.find_all("a"):
-            aria_label = str(a.get("aria-label", "")).lower()
-            title = str(a.get("title", "")).lower()
+            if all(social[k] for k in _MAIN_SOCIAL_KEYS):
+                break
             href = str(a.get("href", ""))
             
             if not href or href == "#":
                 continue
             
-            platform_keywords = {
-                "Facebook": ["facebook", "fb"],
-                "Instagram": ["instagram", "insta"],
-                "LinkedIn": ["linkedin"],
-                "Twitter / X": ["twitter", "tweet", " x "],
-                "YouTube": ["youtube", "yt"],
-                "Pinterest": ["pinterest", "pin"],
-                "TikTok": ["tiktok", "tik tok"]
-            }
+            aria_label = str(a.get("aria-label", "")).lower()
+            title = str(a.get("title", "")).lower()
             
             for platform, keywords in platform_keywords.items():
                 if not social[platform]:
@@ -504,11 +1001,21 @@ def extract_social_links_from_html(html):
             "TikTok": ["fa-tiktok", "icon-tiktok", "tiktok-icon"]
         }
         
+        # One walk collects every element's class string; each icon class is
+        # then a substring test over that list instead of a full find_all
+        classed = []
+        if not all(social[p] for p in icon_classes):
+            for elem in soup.find_all(class_=True):
+                cls = elem.get("class")
+                cls = " ".join(cls) if isinstance(cls, list) else str(cls)
+                if cls:
+                    classed.append((cls.lower(), elem))
+        
         for platform, classes in icon_classes.items():
             if not social[platform]:
                 for icon_class in classes:
                     # Find icon elements with this class
-                    icons = soup.find_all(class_=lambda x: x and icon_class in str(x).lower())
+                    icons = (elem for cls, elem in classed if icon_class in cls)
                     for icon in icons:
                         # Check parent <a> tag
                         parent_a = icon.find_parent("a")
@@ -524,13 +1031,16 @@ def extract_social_links_from_html(html):
         
         # Method 5: Search in onclick handlers
         for elem in soup.find_all(onclick=True):
+            if all(social[k] for k in _MAIN_SOCIAL_KEYS):
+                break
             onclick = str(elem.get("onclick", ""))
+            onclick_lower = onclick.lower()
             for platform, patterns in social_patterns.items():
                 if not social[platform]:
                     for pattern in patterns:
-                        if pattern in onclick.lower():
+                        if pattern in onclick_lower:
                             # Try to extract URL from onclick
-                            url_match = re.search(r'(https?://[^\s\'"<>]+' + re.escape(pattern) + r'[^\s\'"<>]*)', onclick)
+                            url_match = _ONCLICK_URL_RES[pattern].search(onclick)
                             if url_match:
                                 social[platform] = normalize_social_url(url_match.group(1))
                                 break
@@ -540,7 +1050,7 @@ def extract_social_links_from_html(html):
             try:
                 script_content = script.string or script.get_text()
                 if script_content:
-                    json_data = json.loads(script_content)
+                    json_data = json_loads(script_content)
                     
                     # Handle both single object and array
                     if isinstance(json_data, list):
@@ -556,15 +1066,12 @@ def extract_social_links_from_html(html):
         # Method 7: Meta tags (og:see_also, article:author, etc.)
         for meta in soup.find_all("meta"):
             content = str(meta.get("content", ""))
-            content_lower = content.lower()
+            if not content.startswith("http"):
+                continue
             
-            for platform, patterns in social_patterns.items():
+            for platform in _social_platforms(content.lower()):
                 if not social[platform]:
-                    for pattern in patterns:
-                        if pattern in content_lower:
-                            if content.startswith("http"):
-                                social[platform] = normalize_social_url(content)
-                                break
+                    social[platform] = normalize_social_url(content)
         
         # Method 8: Look for social widgets/embeds
         # Facebook widget
@@ -576,21 +1083,18 @@ def extract_social_links_from_html(html):
                     social["Facebook"] = normalize_social_url(href)
                     break
         
-        # Method 9: Search in all text for social URLs
-        page_text = str(soup)
-        for platform, patterns in social_patterns.items():
-            if not social[platform]:
-                for pattern in patterns:
-                    # Look for full URLs
-                    url_pattern = rf'https?://(?:www\.)?{re.escape(pattern)}[^\s\'"<>\)}}]+'
-                    matches = re.findall(url_pattern, page_text, re.IGNORECASE)
-                    for match in matches:
-                        # Skip share links
-                        if "share" not in match.lower() and "sharer" not in match.lower():
-                            social[platform] = normalize_social_url(match)
-                            break
-                    if social[platform]:
-                        break
+        # Method 9: Search the raw HTML for social URLs (one pass for all platforms)
+        best = {}
+        for match in _SOCIAL_URL_RE.finditer(html):
+            platform, rank = _SOCIAL_DOMAIN_RANK[match.group(1).lower()]
+            if social[platform] or (platform in best and best[platform][0] <= rank):
+                continue
+            url = match.group(0)
+            # Skip share links
+            if "share" not in url.lower():
+                best[platform] = (rank, url)
+        for platform, (_, url) in best.items():
+            social[platform] = normalize_social_url(url)
         for k in social:
             if social[k]:
                 social[k] = normalize_social_url(social[k])
@@ -618,25 +1122,18 @@ def _extract_social_from_jsonld(data, social, patterns):
         same_as = [same_as]
     
     for url in same_as:
-        url_lower = str(url).lower()
-        for platform, platform_patterns in patterns.items():
+        for platform in _social_platforms(str(url).lower()):
             if not social[platform]:
-                for pattern in platform_patterns:
-                    if pattern in url_lower:
-                        social[platform] = normalize_social_url(url)
-                        break
+                social[platform] = normalize_social_url(url)
     
     # Check other common properties
     social_properties = ["url", "contactPoint", "author", "publisher"]
     for prop in social_properties:
         value = data.get(prop)
         if isinstance(value, str):
-            for platform, platform_patterns in patterns.items():
+            for platform in _social_platforms(value.lower()):
                 if not social[platform]:
-                    for pattern in platform_patterns:
-                        if pattern in value.lower():
-                            social[platform] = normalize_social_url(value)
-                            break
+                    social[platform] = normalize_social_url(value)
         elif isinstance(value, dict):
             social = _extract_social_from_jsonld(value, social, patterns)
         elif isinstance(value, list):
@@ -644,12 +1141,9 @@ def _extract_social_from_jsonld(data, social, patterns):
                 if isinstance(item, dict):
                     social = _extract_social_from_jsonld(item, social, patterns)
                 elif isinstance(item, str):
-                    for platform, platform_patterns in patterns.items():
+                    for platform in _social_platforms(item.lower()):
                         if not social[platform]:
-                            for pattern in platform_patterns:
-                                if pattern in item.lower():
-                                    social[platform] = normalize_social_url(item)
-                                    break
+                            social[platform] = normalize_social_url(item)
     
     # Check nested objects
     for key, value in data.items():
@@ -664,10 +1158,55 @@ def _extract_social_from_jsonld(data, social, patterns):
 
 
 # ---------------- Theme Color Extraction ----------------
-def extract_theme_colors(html, base_url=None):
+# Patterns compiled once at import; (pattern, priority) pairs
+_CSS_VAR_PATTERNS = [(re.compile(p, re.IGNORECASE), prio) for p, prio in [
+    (r'--primary[^:]*:\s*([^;}\s]+)', 80),
+    (r'--brand[^:]*:\s*([^;}\s]+)', 80),
+    (r'--main-color[^:]*:\s*([^;}\s]+)', 78),
+    (r'--accent[^:]*:\s*([^;}\s]+)', 75),
+    (r'--theme[^:]*:\s*([^;}\s]+)', 75),
+    (r'--color-primary[^:]*:\s*([^;}\s]+)', 80),
+    (r'--color-brand[^:]*:\s*([^;}\s]+)', 80),
+    (r'--color-accent[^:]*:\s*([^;}\s]+)', 75),
+    (r'--secondary[^:]*:\s*([^;}\s]+)', 70),
+    (r'--color-secondary[^:]*:\s*([^;}\s]+)', 70),
+]]
+
+_CSS_SELECTOR_PATTERNS = [(re.compile(p, re.IGNORECASE | re.DOTALL), prio) for p, prio in [
+    (r'\.btn-primary[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 70),
+    (r'\.button-primary[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 70),
+    (r'\.btn[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 60),
+    (r'\.primary[^{]*\{[^}]*(?:background-)?color:\s*([^;}\s]+)', 65),
+    (r'a[^{]*\{[^}]*color:\s*([^;}\s]+)', 50),
+    (r'a:hover[^{]*\{[^}]*color:\s*([^;}\s]+)', 55),
+    (r'header[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 60),
+    (r'\.header[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 60),
+    (r'nav[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 55),
+    (r'\.navbar[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 55),
+    (r'\.nav[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 55),
+    (r'\.logo[^{]*\{[^}]*color:\s*([^;}\s]+)', 65),
+    (r'\.brand[^{]*\{[^}]*color:\s*([^;}\s]+)', 65),
+    (r'\.site-title[^{]*\{[^}]*color:\s*([^;}\s]+)', 60),
+    (r'h1[^{]*\{[^}]*color:\s*([^;}\s]+)', 45),
+    (r'\.cta[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 60),
+    (r'\.hero[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 55),
+]]
+
+_CSS_COLOR_RE = re.compile(r'#[0-9a-fA-F]{3,6}\b|rgba?\([^)]+\)|hsla?\([^)]+\)', re.IGNORECASE)
+_STYLE_BG_RE = re.compile(r'background(?:-color)?:\s*([^;]+)', re.IGNORECASE)
+_STYLE_COLOR_RE = re.compile(r'(?<![a-z-])color:\s*([^;]+)', re.IGNORECASE)
+_COLOR_VALUE_RE = re.compile(r'(#[0-9a-fA-F]{3,8}|rgba?\([^)]+\)|hsla?\([^)]+\)|[a-z]+)', re.IGNORECASE)
+_RGB_RE = re.compile(r'rgba?\s*\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)')
+_HSL_RE = re.compile(r'hsla?\s*\(\s*(\d+)\s*,\s*(\d+)%?\s*,\s*(\d+)%?')
+# Deletes hex digits; a string is valid hex iff nothing is left afterwards
+_HEX_DIGITS_DELETE = str.maketrans('', '', '0123456789abcdef')
+
+
+def extract_theme_colors(html, base_url=None, soup=None):
     """
     Extract theme/brand colors from a website.
     Returns primary color and color palette.
+    Pass `soup` to reuse a tree the caller already parsed from `html`.
     """
     colors = {
         "primary_color": "",
@@ -682,7 +1221,8 @@ def extract_theme_colors(html, base_url=None):
         return colors
     
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        if soup is None:
+            soup = BeautifulSoup(html, "lxml")
         found_colors = []
         
         # Method 1: Meta theme-color (highest priority - often brand color)
@@ -721,21 +1261,9 @@ def extract_theme_colors(html, base_url=None):
             all_css += (style.get_text() or "") + "\n"
         
         # Method 2: CSS Variables (high priority)
-        css_var_patterns = [
-            (r'--primary[^:]*:\s*([^;}\s]+)', 80),
-            (r'--brand[^:]*:\s*([^;}\s]+)', 80),
-            (r'--main-color[^:]*:\s*([^;}\s]+)', 78),
-            (r'--accent[^:]*:\s*([^;}\s]+)', 75),
-            (r'--theme[^:]*:\s*([^;}\s]+)', 75),
-            (r'--color-primary[^:]*:\s*([^;}\s]+)', 80),
-            (r'--color-brand[^:]*:\s*([^;}\s]+)', 80),
-            (r'--color-accent[^:]*:\s*([^;}\s]+)', 75),
-            (r'--secondary[^:]*:\s*([^;}\s]+)', 70),
-            (r'--color-secondary[^:]*:\s*([^;}\s]+)', 70),
-        ]
         
-        for pattern, priority in css_var_patterns:
-            matches = re.findall(pattern, all_css, re.IGNORECASE)
+        for pattern, priority in _CSS_VAR_PATTERNS:
+            matches = pattern.findall(all_css)
             for match in matches:
                 color = normalize_color(match.strip())
                 if color and not is_neutral_color(color):
@@ -744,28 +1272,9 @@ def extract_theme_colors(html, base_url=None):
                         colors["primary_color"] = color
         
         # Method 3: Common CSS selectors for brand colors
-        css_selector_patterns = [
-            (r'\.btn-primary[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 70),
-            (r'\.button-primary[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 70),
-            (r'\.btn[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 60),
-            (r'\.primary[^{]*\{[^}]*(?:background-)?color:\s*([^;}\s]+)', 65),
-            (r'a[^{]*\{[^}]*color:\s*([^;}\s]+)', 50),
-            (r'a:hover[^{]*\{[^}]*color:\s*([^;}\s]+)', 55),
-            (r'header[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 60),
-            (r'\.header[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 60),
-            (r'nav[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 55),
-            (r'\.navbar[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 55),
-            (r'\.nav[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 55),
-            (r'\.logo[^{]*\{[^}]*color:\s*([^;}\s]+)', 65),
-            (r'\.brand[^{]*\{[^}]*color:\s*([^;}\s]+)', 65),
-            (r'\.site-title[^{]*\{[^}]*color:\s*([^;}\s]+)', 60),
-            (r'h1[^{]*\{[^}]*color:\s*([^;}\s]+)', 45),
-            (r'\.cta[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 60),
-            (r'\.hero[^{]*\{[^}]*background(?:-color)?:\s*([^;}\s]+)', 55),
-        ]
         
-        for pattern, priority in css_selector_patterns:
-            matches = re.findall(pattern, all_css, re.IGNORECASE | re.DOTALL)
+        for pattern, priority in _CSS_SELECTOR_PATTERNS:
+            matches = pattern.findall(all_css)
             for match in matches:
                 color = normalize_color(match.strip())
                 if color and not is_neutral_color(color):
@@ -828,11 +1337,7 @@ def extract_theme_colors(html, base_url=None):
                         found_colors.append(("svg-path", color, 50))
         
         # Method 7: Analyze most frequent non-neutral colors in CSS (FIXED REGEX)
-        all_colors_in_css = re.findall(
-            r'#[0-9a-fA-F]{3,6}\b|rgba?\([^)]+\)|hsla?\([^)]+\)',
-            all_css,
-            re.IGNORECASE
-        )
+        all_colors_in_css = _CSS_COLOR_RE.findall(all_css)
 
         color_frequency = Counter()
         for c in all_colors_in_css:
@@ -851,14 +1356,14 @@ def extract_theme_colors(html, base_url=None):
             style = elem.get("style", "")
             
             # Background color
-            bg_match = re.search(r'background(?:-color)?:\s*([^;]+)', style, re.IGNORECASE)
+            bg_match = _STYLE_BG_RE.search(style)
             if bg_match:
                 color = normalize_color(bg_match.group(1).strip().split()[0])
                 if color and not is_neutral_color(color):
                     found_colors.append(("inline-bg", color, 40))
             
             # Text color (excluding background-color)
-            color_match = re.search(r'(?<![a-z-])color:\s*([^;]+)', style, re.IGNORECASE)
+            color_match = _STYLE_COLOR_RE.search(style)
             if color_match:
                 color = normalize_color(color_match.group(1).strip().split()[0])
                 if color and not is_neutral_color(color):
@@ -937,12 +1442,12 @@ def normalize_color(color_str):
         
         if len(hex_color) == 3:
             hex_color = ''.join([c*2 for c in hex_color])
-        if len(hex_color) == 6 and all(c in '0123456789abcdef' for c in hex_color):
+        if len(hex_color) == 6 and not hex_color.translate(_HEX_DIGITS_DELETE):
             return '#' + hex_color.upper()
         return ""
     
     # Handle rgb/rgba
-    rgb_match = re.match(r'rgba?\s*\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)', color_str)
+    rgb_match = _RGB_RE.match(color_str)
     if rgb_match:
         r, g, b = int(rgb_match.group(1)), int(rgb_match.group(2)), int(rgb_match.group(3))
         if 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255:
@@ -950,7 +1455,7 @@ def normalize_color(color_str):
         return ""
     
     # Handle hsl/hsla
-    hsl_match = re.match(r'hsla?\s*\(\s*(\d+)\s*,\s*(\d+)%?\s*,\s*(\d+)%?', color_str)
+    hsl_match = _HSL_RE.match(color_str)
     if hsl_match:
         h = int(hsl_match.group(1)) / 360
         s = int(hsl_match.group(2)) / 100
@@ -1129,13 +1634,13 @@ def extract_color_from_style(style_string, property_name):
         return ""
     
     if property_name == "background":
-        pattern = r'background(?:-color)?:\s*([^;]+)'
+        pattern = _STYLE_BG_RE
     elif property_name == "color":
-        pattern = r'(?<![a-z-])color:\s*([^;]+)'
+        pattern = _STYLE_COLOR_RE
     else:
-        pattern = rf'{property_name}:\s*([^;]+)'
+        pattern = re.compile(rf'{re.escape(property_name)}:\s*([^;]+)', re.IGNORECASE)
     
-    match = re.search(pattern, style_string, re.IGNORECASE)
+    match = pattern.search(style_string)
     if match:
         value = match.group(1).strip()
         # Handle multiple values (e.g., "red url(...)" or "linear-gradient(...)")
@@ -1144,11 +1649,7 @@ def extract_color_from_style(style_string, property_name):
             return ""
         
         # Try to find a color value (FIXED REGEX)
-        color_match = re.match(
-            r'(#[0-9a-fA-F]{3,8}|rgba?\([^)]+\)|hsla?\([^)]+\)|[a-z]+)',
-            value,
-            re.IGNORECASE
-        )
+        color_match = _COLOR_VALUE_RE.match(value)
         if color_match:
             return normalize_color(color_match.group(1))
     
@@ -1160,13 +1661,27 @@ def extract_all_emails(text: str, html: str = None) -> list:
     """
     Extract all valid emails from text and HTML.
     Handles Cloudflare protection and filters invalid emails.
+    mailto: links (and Cloudflare-protected addresses) are trusted first; the
+    regex scans over the whole text/HTML only run when those yield nothing.
     """
+    if html:
+        try:
+            linked = []
+            for target in _MAILTO_HREF_RE.findall(str(html)):
+                linked.extend(_EMAIL_RE.findall(urllib.parse.unquote(html_lib.unescape(target))))
+            linked.extend(extract_cloudflare_emails(html))
+            linked = clean_email_list(linked)
+            if linked:
+                return linked
+        except Exception:
+            pass
+    
     emails = []
     
     try:
         # Standard regex extraction from text
         if text:
-            found = re.findall(r'[a-zA-Z0-9._+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', str(text))
+            found = _EMAIL_RE.findall(str(text))
             emails.extend(found)
     except Exception:
         pass
@@ -1181,7 +1696,7 @@ def extract_all_emails(text: str, html: str = None) -> list:
         
         try:
             # Also try standard regex on HTML
-            html_emails = re.findall(r'[a-zA-Z0-9._+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', str(html))
+            html_emails = _EMAIL_RE.findall(str(html))
             emails.extend(html_emails)
         except Exception:
             pass
@@ -1192,35 +1707,15 @@ def extract_all_emails(text: str, html: str = None) -> list:
     return valid_emails if valid_emails else []
 
 
-def extract_all_phones(text: str) -> list:
-    """Extract all valid phone numbers, removing duplicates."""
-    if not text:
-        return []
-    
-    phones = []
-    
-    # Safe patterns for phone extraction (FIXED REGEX)
-    patterns = [
-        r'\+?\d[\d\s().-]{8,15}',
-        r'\b\d{3}[\s.-]\d{3}[\s.-]\d{4}\b',
-        r'\+\d{1,3}\s?\d{4,5}\s?\d{4,6}',
-    ]
-    
-    for pattern in patterns:
-        try:
-            found = re.findall(pattern, str(text))
-            phones.extend(found)
-        except Exception:
-            continue
-    
-    # Clean and deduplicate
+def _dedupe_phone_matches(phones):
+    """Keep plausible phone numbers (10-15 digits), first occurrence per digit string."""
     cleaned_phones = []
     seen_digits = set()
     
     for phone in phones:
         try:
             phone = str(phone).strip()
-            digits = re.sub(r'\D', '', phone)
+            digits = _NON_DIGIT_RE.sub('', phone)
             
             # Must have at least 10 digits and not seen before
             if len(digits) >= 10 and len(digits) <= 15 and digits not in seen_digits:
@@ -1232,6 +1727,38 @@ def extract_all_phones(text: str) -> list:
     return cleaned_phones
 
 
+def extract_all_phones(text: str, html: str = None) -> list:
+    """
+    Extract all valid phone numbers, removing duplicates.
+    tel: links in `html` are used when present; otherwise the text is scanned.
+    """
+    if html:
+        try:
+            linked = _dedupe_phone_matches(
+                urllib.parse.unquote(html_lib.unescape(target))
+                for target in _TEL_HREF_RE.findall(str(html))
+            )
+            if linked:
+                return linked
+        except Exception:
+            pass
+    
+    if not text:
+        return []
+    
+    phones = []
+    
+    # Safe patterns for phone extraction (compiled at module level)
+    for pattern in _PHONE_PATTERNS:
+        try:
+            found = pattern.findall(str(text))
+            phones.extend(found)
+        except Exception:
+            continue
+    
+    return _dedupe_phone_matches(phones)
+
+
 def extract_all_addresses(text: str) -> list:
     """
     Extract physical addresses - supports Indian, US, and international formats.
@@ -1245,104 +1772,80 @@ def extract_all_addresses(text: str) -> list:
     try:
         potential = []
         
-        # Strategy 1: Find text around PIN codes (Indian 6-digit)
-        # Look FURTHER BACK to capture building numbers
-        pin_matches = list(re.finditer(r'\b(\d{6})\b', text))
-        for match in pin_matches:
-            # Look back further (200 chars) to capture full address
-            start = max(0, match.start() - 200)
-            end = min(len(text), match.end() + 10)
-            context = text[start:end].strip()
+        # Every strategy needs a 5+ digit run (PIN or ZIP). One cheap scan up
+        # front lets us skip the lazy, backtracking patterns below on text
+        # that cannot contain an address at all.
+        if not _DIGITS5_RE.search(text):
+            return []
+
+        if _DIGITS6_RE.search(text):
+            # Strategy 1: Find text around PIN codes (Indian 6-digit)
+            # Look FURTHER BACK to capture building numbers
+            pin_matches = list(_PIN_RE.finditer(text))
+            for match in pin_matches:
+                # Look back further (200 chars) to capture full address
+                start = max(0, match.start() - 200)
+                end = min(len(text), match.end() + 10)
+                context = text[start:end].strip()
             
-            # Find a good starting point (number, or after common delimiters)
-            # Look for address start patterns
-            address_start_patterns = [
-                r'\b(\d{1,5}[,\s])',  # Starts with number
-                r'(?:Address|Location|Office)[:\s]+',  # After label
-                r'(?:\.\s+|\n\s*)(\d{1,5}[,\s])',  # After sentence, starts with number
-            ]
-            
-            best_start = 0
-            for pattern in address_start_patterns:
-                match_start = re.search(pattern, context, re.IGNORECASE)
-                if match_start:
-                    best_start = match_start.start()
-                    break
+                # Find a good starting point (number, or after common delimiters)
+                best_start = 0
+                for pattern in _ADDRESS_START_PATTERNS:
+                    match_start = pattern.search(context)
+                    if match_start:
+                        best_start = match_start.start()
+                        break
             
-            # If we found a number at start, use it
-            number_match = re.search(r'\b(\d{1,5})[,\s]+[A-Za-z]', context)
-            if number_match and number_match.start() < 50:  # Number within first 50 chars
-                best_start = number_match.start()
+                # If we found a number at start, use it
+                number_match = _ADDRESS_NUMBER_START_RE.search(context)
+                if number_match and number_match.start() < 50:  # Number within first 50 chars
+                    best_start = number_match.start()
             
-            context = context[best_start:].strip()
+                context = context[best_start:].strip()
             
-            # Clean up - remove text after PIN code
-            pin_in_context = re.search(r'\b\d{6}\b', context)
-            if pin_in_context:
-                context = context[:pin_in_context.end()].strip()
+                # Clean up - remove text after PIN code
+                pin_in_context = _PIN_RE.search(context)
+                if pin_in_context:
+                    context = context[:pin_in_context.end()].strip()
             
-            if len(context) > 20:
-                potential.append(context)
+                if len(context) > 20:
+                    potential.append(context)
         
-        # Strategy 2: Direct pattern for Indian addresses starting with number
-        indian_pattern = r'(\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/\'\"]+?(?:Gujarat|Maharashtra|Delhi|Karnataka|Rajasthan|Tamil Nadu|India)[,\s]*\d{6})'
-        try:
-            matches = re.findall(indian_pattern, text, re.IGNORECASE)
-            potential.extend(matches)
-        except:
-            pass
+            # Strategy 2: Direct pattern for Indian addresses starting with number
+            try:
+                matches = _ADDR_INDIAN_RE.findall(text)
+                potential.extend(matches)
+            except:
+                pass
         
-        # Strategy 3: Pattern with building/tower/floor
-        building_pattern = r'(\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/\'\"]+?(?:Tower|Building|Floor|Complex|Plaza|Block|Office)[A-Za-z0-9\s,.\-/\'\"]+?\d{6})'
-        try:
-            matches = re.findall(building_pattern, text, re.IGNORECASE)
-            potential.extend(matches)
-        except:
-            pass
+            # Strategy 3: Pattern with building/tower/floor
+            try:
+                matches = _ADDR_BUILDING_RE.findall(text)
+                potential.extend(matches)
+            except:
+                pass
         
-        # Strategy 4: Look for address after specific labels
-        label_pattern = r'(?:Address|Location|Office|Headquarters|Contact)[:\s]+(\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/\'\"]{15,180}?\d{6})'
-        try:
-            matches = re.findall(label_pattern, text, re.IGNORECASE)
-            potential.extend(matches)
-        except:
-            pass
+            # Strategy 4: Look for address after specific labels
+            try:
+                matches = _ADDR_LABEL_RE.findall(text)
+                potential.extend(matches)
+            except:
+                pass
         
-        # Strategy 5: Generic pattern - number followed by text ending in PIN
-        generic_pattern = r'(\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-/\'\"]{20,180}?\b\d{6})\b'
-        try:
-            matches = re.findall(generic_pattern, text)
-            potential.extend(matches)
-        except:
-            pass
+            # Strategy 5: Generic pattern - number followed by text ending in PIN
+            try:
+                matches = _ADDR_GENERIC_RE.findall(text)
+                potential.extend(matches)
+            except:
+                pass
         
         # Strategy 6: US ZIP pattern
-        us_pattern = r'(\d{1,5}[,\s]+[A-Za-z][A-Za-z0-9\s,.\-]{15,100}\s+[A-Z]{2}\s*\d{5}(?:-\d{4})?)'
         try:
-            matches = re.findall(us_pattern, text)
+            matches = _ADDR_US_RE.findall(text)
             potential.extend(matches)
         except:
             pass
         
-        # Keywords for validation
-        address_keywords = [
-            'floor', 'tower', 'block', 'building', 'complex', 'plaza', 'office',
-            'nagar', 'colony', 'society', 'road', 'street', 'lane', 'avenue',
-            'sector', 'phase', 'near', 'opposite', 'marg', 'chowk', 'bh.', 'nr.'
-        ]
-        
-        locations = [
-            'ahmedabad', 'gujarat', 'mumbai', 'maharashtra', 'delhi',
-            'bangalore', 'karnataka', 'chennai', 'india', 'pune',
-            'hyderabad', 'kolkata', 'amraiwadi', 'surat', 'vadodara'
-        ]
-        
-        blacklist = [
-            'copyright', 'reserved', 'privacy', 'terms', 'cookie',
-            'facebook', 'twitter', 'linkedin', 'instagram', '@',
-            'click', 'subscribe', 'newsletter', 'loading'
-        ]
-        
         for addr in potential:
             if not isinstance(addr, str):
                 continue
@@ -1355,28 +1858,20 @@ def extract_all_addresses(text: str) -> list:
                 continue
             
             # Blacklist check
-            if any(bl in addr_lower for bl in blacklist):
+            if _ADDRESS_BLACKLIST_RE.search(addr_lower):
                 continue
             
-            # Must have PIN/ZIP
-            has_pin = bool(re.search(r'\b\d{6}\b', addr))
-            has_zip = bool(re.search(r'\b\d{5}\b', addr))
-            
-            if not (has_pin or has_zip):
+            # Must have PIN/ZIP (every candidate that passes is accepted)
+            if not (_PIN_RE.search(addr) or _ZIP_RE.search(addr)):
                 continue
             
-            # Should have keyword or location
-            has_keyword = any(kw in addr_lower for kw in address_keywords)
-            has_location = any(loc in addr_lower for loc in locations)
+            # Clean up
+            addr = " ".join(addr.split())
+            addr = addr.strip('.,;:|')
+            addr = _EMAIL_ARTIFACT_RE.sub('', addr).strip()
             
-            if has_pin or has_zip or has_keyword or has_location:
-                # Clean up
-                addr = re.sub(r'\s+', ' ', addr).strip()
-                addr = addr.strip('.,;:|')
-                addr = re.sub(r'$$email.*?$$', '', addr).strip()
-                
-                if len(addr) >= 20:
-                    valid_addresses.append(addr)
+            if len(addr) >= 20:
+                valid_addresses.append(addr)
                     
     except Exception as e:
         print(f"Address extraction error: {e}")
@@ -1395,6 +1890,9 @@ def deduplicate_addresses(addresses: list) -> list:
     sorted_addresses = sorted(addresses, key=len, reverse=True)
     
     cleaned = []
+    # Normalized form and word set of each kept address, parallel to
+    # `cleaned`, so they're computed once per address, not once per pair
+    cleaned_keys = []
     
     for addr in sorted_addresses:
         if not isinstance(addr, str):
@@ -1405,14 +1903,14 @@ def deduplicate_addresses(addresses: list) -> list:
             continue
             
         # Normalize for comparison
-        addr_normalized = re.sub(r'[,.\-\s]+', ' ', addr.lower()).strip()
-        addr_normalized = re.sub(r'\s+', ' ', addr_normalized)
+        # (the normalize pattern already folds whitespace runs into one space)
+        addr_normalized = _ADDR_NORMALIZE_RE.sub(' ', addr.lower()).strip()
+        words1 = set(addr_normalized.split())
         
         is_duplicate = False
         
-        for i, existing in enumerate(cleaned):
-            existing_normalized = re.sub(r'[,.\-\s]+', ' ', existing.lower()).strip()
-            existing_normalized = re.sub(r'\s+', ' ', existing_normalized)
+        for i, (existing_normalized, words2) in enumerate(cleaned_keys):
+            existing = cleaned[i]
             
             # Check if one contains the other
             if addr_normalized in existing_normalized:
@@ -1424,13 +1922,11 @@ def deduplicate_addresses(addresses: list) -> list:
                 # Existing is substring of current (current is longer/better)
                 # Replace existing with current (the longer one)
                 cleaned[i] = addr
+                cleaned_keys[i] = (addr_normalized, words1)
                 is_duplicate = True
                 break
             
             # Check word overlap for fuzzy matching
-            words1 = set(addr_normalized.split())
-            words2 = set(existing_normalized.split())
-            
             if words1 and words2:
                 intersection = words1 & words2
                 smaller_set = min(len(words1), len(words2))
@@ -1440,11 +1936,13 @@ def deduplicate_addresses(addresses: list) -> list:
                     # Keep the LONGER one (more complete)
                     if len(addr) > len(existing):
                         cleaned[i] = addr  # Replace with longer
+                        cleaned_keys[i] = (addr_normalized, words1)
                     is_duplicate = True
                     break
         
         if not is_duplicate:
             cleaned.append(addr)
+            cleaned_keys.append((addr_normalized, words1))
     
     return cleaned
 
@@ -1458,52 +1956,6 @@ def clean_address_list(addresses: list) -> list:
     
     filtered = []
     
-    # Words that should NOT appear in physical addresses
-    invalid_words = [
-        'association', 'college', 'university', 'school', 'hospital',
-        'professor', 'doctor', 'training', 'faculty', 'speaker',
-        'director', 'president', 'fellow', 'textbook', 'published',
-        'articles', 'teaches', 'courses', 'medicine', 'pediatrics',
-        'clinical', 'copyright', 'reserved', 'privacy', 'terms',
-        'cookie', 'disclaimer', 'subscribe', 'newsletter', 'download',
-        'facebook', 'twitter', 'linkedin', 'instagram', 'youtube'
-    ]
-    
-    # Address indicator keywords (positive signals)
-    address_keywords = [
-        # Buildings/Structures
-        'floor', 'tower', 'block', 'building', 'complex', 'plaza',
-        'mall', 'center', 'centre', 'park', 'house', 'office',
-        'suite', 'unit', 'shop', 'flat', 'plot', 'no.', 'no ',
-        # Indian specific
-        'nagar', 'colony', 'society', 'chowk', 'marg', 'road', 'rd',
-        'gali', 'sector', 'phase', 'vihar', 'enclave', 'garden',
-        'bazar', 'bazaar', 'market', 'near', 'opp', 'opposite', 
-        'behind', 'beside', 'cross', 'main', 'layout', 'extension',
-        'bh.', 'nr.', 'nr ', 'c.t.m', 'ctm',
-        # US/Western
-        'street', 'st.', 'st ', 'avenue', 'ave', 'drive', 'dr.',
-        'lane', 'ln', 'boulevard', 'blvd', 'highway', 'hwy',
-        'court', 'ct', 'way', 'place', 'pl', 'square', 'sq',
-        'terrace', 'parkway', 'circle', 'route'
-    ]
-    
-    # Location indicators (cities/states/countries)
-    location_indicators = [
-        # Indian cities
-        'ahmedabad', 'mumbai', 'delhi', 'bangalore', 'bengaluru',
-        'chennai', 'hyderabad', 'pune', 'kolkata', 'jaipur',
-        'surat', 'vadodara', 'gandhinagar', 'rajkot', 'indore',
-        'lucknow', 'noida', 'gurgaon', 'gurugram', 'chandigarh',
-        'amraiwadi', 'bopal', 'satellite', 'navrangpura',
-        # Indian states
-        'gujarat', 'maharashtra', 'karnataka', 'tamil nadu',
-        'telangana', 'rajasthan', 'uttar pradesh', 'haryana',
-        'punjab', 'west bengal', 'madhya pradesh', 'kerala',
-        # Countries
-        'india', 'usa', 'uk', 'canada', 'australia'
-    ]
-    
     for addr in addresses:
         if not isinstance(addr, str):
             continue
@@ -1516,95 +1968,271 @@ def clean_address_list(addresses: list) -> list:
             continue
         
         # Must NOT contain invalid words
-        has_invalid = False
-        for word in invalid_words:
-            if word in addr_lower:
-                has_invalid = True
-                break
-        
-        if has_invalid:
+        if _ADDRESS_INVALID_WORD_RE.search(addr_lower):
             continue
         
-        # Check for positive indicators
-        has_pin = bool(re.search(r'\b\d{6}\b', addr))           # Indian PIN (6 digits)
-        has_zip = bool(re.search(r'\b\d{5}(?:-\d{4})?\b', addr)) # US ZIP (5 or 9 digits)
-        has_keyword = any(kw in addr_lower for kw in address_keywords)
-        has_location = any(loc in addr_lower for loc in location_indicators)
-        has_number = bool(re.search(r'\d', addr))               # Has any digit
-        has_comma = ',' in addr                                  # Has comma (structure)
-        word_count = len(addr.split())
-        
-        # Flexible validation rules (pass ANY of these):
-        is_valid = False
+        # Flexible validation rules (pass ANY of these), strongest first so
+        # most candidates are settled before the keyword scans run.
         
         # Rule 1: Has PIN or ZIP code (strong indicator)
-        if has_pin or has_zip:
-            is_valid = True
-        
-        # Rule 2: Has address keyword + location name
-        elif has_keyword and has_location:
-            is_valid = True
-        
-        # Rule 3: Has keyword + number + comma (structured address)
-        elif has_keyword and has_number and has_comma:
-            is_valid = True
-        
-        # Rule 4: Has location + comma + reasonable length
-        elif has_location and has_comma and word_count >= 4:
-            is_valid = True
+        is_valid = bool(_PIN_RE.search(addr) or _ZIP_FULL_RE.search(addr))
         
-        # Rule 5: Has multiple keywords (very likely an address)
-        elif sum(1 for kw in address_keywords if kw in addr_lower) >= 2:
-            is_valid = True
+        if not is_valid:
+            has_keyword = bool(_ADDRESS_KEYWORD_RE.search(addr_lower))
+            has_location = bool(_ADDRESS_LOCATION_RE.search(addr_lower))
+            has_comma = ',' in addr                              # Has comma (structure)
+            
+            # Rule 2: Has address keyword + location name
+            if has_keyword and has_location:
+                is_valid = True
+            
+            # Rule 3: Has keyword + number + comma (structured address)
+            elif has_keyword and has_comma and _DIGIT_RE.search(addr):
+                is_valid = True
+            
+            # Rule 4: Has location + comma + reasonable length
+            elif has_location and has_comma and len(addr.split()) >= 4:
+                is_valid = True
+            
+            # Rule 5: Has multiple keywords (very likely an address); keywords
+            # overlap ('pl' in 'plaza'), so distinct ones are counted here
+            elif has_keyword and sum(1 for kw in _ADDRESS_KEYWORDS if kw in addr_lower) >= 2:
+                is_valid = True
         
         if is_valid:
             # Clean up the address
             addr = addr.strip().rstrip('.,;:|')
             
             # Remove email artifacts
-            addr = re.sub(r'$$email.*?$$', '', addr)
-            addr = re.sub(r'\s+', ' ', addr).strip()
+            addr = _EMAIL_ARTIFACT_RE.sub('', addr)
+            addr = " ".join(addr.split())
             
             if len(addr) >= 15:  # Still valid length after cleaning
                 filtered.append(addr)
     
     return deduplicate_addresses(filtered)
 
+
+def extract_fallback_contacts(all_text, all_html, contact_text="", contact_html=""):
+    """
+    Regex-extracted (emails, phones, addresses) to merge with the LLM result.
+    Emails and phones come from the contact page first and the whole site only
+    on a miss. A failing extractor is reported and yields an empty list.
+    """
+    try:
+        emails = (
+            contact_html and extract_all_emails(contact_text, contact_html)
+        ) or extract_all_emails(all_text, all_html)
+    except Exception as e:
+        print(f"❌ Error extracting emails: {e}")
+        emails = []
+    try:
+        phones = (
+            contact_html and extract_all_phones(contact_text, contact_html)
+        ) or extract_all_phones(all_text, all_html)
+    except Exception as e:
+        print(f"❌ Error extracting phones: {e}")
+        phones = []
+    try:
+        addresses = extract_all_addresses(all_text)
+    except Exception as e:
+        print(f"❌ Error extracting addresses: {e}")
+        addresses = []
+    return emails, phones, addresses
+
 # ---------------- Smart Chunking ----------------
-def chunk_text(text, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
-    """Split text into overlapping chunks for better context."""
+def budget_page_texts(texts, limit=MAX_TEXT_CHARS):
+    """
+    Page texts worth combining: a page whose text repeats an earlier page
+    exactly (a redirect or a duplicate URL) is skipped, and the total is cut
+    off at `limit` characters so huge sites don't balloon cleaning and chunking.
+    Whole texts are compared; pages often share kilobytes of identical nav.
+    """
+    kept, seen, remaining = [], set(), limit
+    for text in texts:
+        if not text or remaining <= 0:
+            continue
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        kept.append(text[:remaining])
+        remaining -= len(kept[-1]) + 1
+    return kept
+
+
+def dedupe_sentences(text):
+    """
+    Drop repeated sentences (shared headers, footers, nav) keeping the first
+    occurrence, so boilerplate across pages isn't chunked and embedded twice.
+    """
+    return " ".join(dict.fromkeys(s for s in _SENTENCE_SPLIT_RE.split(clean_text(text)) if s))
+
+
+_token_encoder_cache = None
+_token_encoder_lock = threading.Lock()
+
+
+def _load_token_encoder():
+    """
+    Load the tiktoken encoder on a helper thread, giving up after
+    CHUNK_ENCODER_TIMEOUT seconds: a first-time BPE download on a dead network
+    would otherwise block forever. None if it can't be loaded in time.
+    """
+    result = {}
+
+    def load():
+        try:
+            import tiktoken
+            result["encoder"] = tiktoken.get_encoding(CHUNK_ENCODING)
+        except Exception as e:
+            result["error"] = e
+
+    loader = threading.Thread(target=load, daemon=True)
+    loader.start()
+    loader.join(CHUNK_ENCODER_TIMEOUT)
+    if "encoder" in result:
+        return result["encoder"]
+    error = result.get("error", f"BPE file not loaded within {CHUNK_ENCODER_TIMEOUT:g}s")
+    print(f"⚠️ tiktoken unavailable, chunking by words: {error}")
+    return None
+
+
+def get_token_encoder():
+    """
+    Shared tiktoken encoder for chunking; None if tiktoken or its BPE file is
+    unavailable. Loaded once per process (the API does it at startup).
+    """
+    global _token_encoder_cache
+    if _token_encoder_cache is None:
+        with _token_encoder_lock:
+            if _token_encoder_cache is None:
+                _token_encoder_cache = _load_token_encoder() or False
+    return _token_encoder_cache or None
+
+
+def chunk_text(text, size=None, overlap=None):
+    """
+    Split text into overlapping, sentence-aligned chunks for better context.
+    Sizes are in tokens (CHUNK_TOKENS/CHUNK_TOKEN_OVERLAP) when tiktoken is
+    available, otherwise in words (CHUNK_SIZE/CHUNK_OVERLAP).
+    """
     text = clean_text(text)
     if not text:
         return []
     
+    enc = get_token_encoder()
+    if size is None:
+        size = CHUNK_TOKENS if enc else CHUNK_SIZE
+    if overlap is None:
+        overlap = CHUNK_TOKEN_OVERLAP if enc else CHUNK_OVERLAP
+    
     try:
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        chunks, current = [], ""
-
-        for s in sentences:
-            if len(current.split()) + len(s.split()) <= size:
-                current += " " + s
-            else:
-                if current.strip():
-                    chunks.append(current.strip())
-                current = s
-
-        if current.strip():
-            chunks.append(current.strip())
+        overlap = max(0, min(overlap, size - 1))
+        sentences = [s for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
+        if enc:
+            # Later sentences keep their leading space so decoded windows read naturally
+            pieces = enc.encode_ordinary_batch([s if i == 0 else " " + s for i, s in enumerate(sentences)])
+        else:
+            pieces = [s.split() for s in sentences]
+
+        # Tokenize once; each sentence becomes the offset where it ends,
+        # and chunks are [start:end) windows into the shared unit list.
+        units, ends = [], []
+        for piece in pieces:
+            if piece:
+                units.extend(piece)
+                ends.append(len(units))
+
+        if enc:
+            join = lambda a, b: enc.decode(units[a:b], errors="ignore").strip()
+        else:
+            # clean_text leaves exactly one space between words, so a word
+            # window is a single slice of text between precomputed offsets
+            offsets = list(itertools.accumulate((len(w) + 1 for w in units), initial=0))
+            join = lambda a, b: text[offsets[a]:offsets[b] - 1]
+
+        chunks, start, end = [], 0, 0
+        for e in ends:
+            if e - start > size and end > start:
+                chunks.append(join(start, end))
+                # Carry the tail of the previous chunk over for context
+                start = max(start, end - overlap)
+            end = e
+
+        if end > start:
+            chunks.append(join(start, end))
 
         return chunks
     except Exception:
         # Fallback: simple word-based chunking
         words = text.split()
-        chunks = []
-        for i in range(0, len(words), size - overlap):
-            chunk = " ".join(words[i:i + size])
-            if chunk:
-                chunks.append(chunk)
+        step = max(1, size - overlap)
+        return [" ".join(words[i:i + size]) for i in range(0, len(words), step)]
+
+
+# Words that mark a chunk as likely to hold the fields RAG_QUERY asks for
+_RAG_KEYWORD_RE = re.compile(
+    r'\b(?:about|company|services?|solutions|products|contact|e-?mail|phone|tel|call|'
+    r'address|office|location|headquarters|street|road)\b|@',
+    re.IGNORECASE
+)
+
+
+def limit_chunks(chunks, limit=MAX_CHUNKS):
+    """
+    Keep at most `limit` chunks before embedding, preferring those with the
+    most business/contact keywords. Original order is preserved.
+    """
+    if len(chunks) <= limit:
         return chunks
+    scores = [len(_RAG_KEYWORD_RE.findall(c)) for c in chunks]
+    keep = sorted(range(len(chunks)), key=lambda i: (-scores[i], i))[:limit]
+    return [chunks[i] for i in sorted(keep)]
 
 
 # ---------------- Sitemap (Improved) ----------------
+def _get_capped(url, timeout=10, max_bytes=SITEMAP_MAX_BYTES):
+    """
+    Stream a GET body, stopping after max_bytes so a huge or endless
+    response can't exhaust memory. Returns b"" unless the status is 200.
+    """
+    buf = io.BytesIO()
+    with SESSION.get(url, timeout=timeout, stream=True) as r:
+        if r.status_code != 200:
+            return b""
+        for block in r.iter_content(chunk_size=64 * 1024):
+            buf.write(block)
+            if buf.tell() >= max_bytes:
+                print(f"⚠️ Sitemap truncated at {max_bytes:,} bytes: {url}")
+                break
+    return buf.getvalue()[:max_bytes]
+
+
+def _parse_sitemap(content):
+    """
+    Stream <loc> entries out of a sitemap or sitemap index without building the tree.
+    Returns (sub_sitemap_urls, all_locs).
+    """
+    sub_urls, locs = [], []
+    try:
+        for _, elem in lxml.etree.iterparse(io.BytesIO(content), tag="{*}loc", recover=True):
+            text = (elem.text or "").strip()
+            parent = elem.getparent()
+            if text:
+                locs.append(text)
+                if parent is not None and parent.tag.rsplit("}", 1)[-1] == "sitemap":
+                    sub_urls.append(text)
+            # Free what we've read so memory stays flat on huge sitemaps
+            elem.clear()
+            if parent is not None:
+                while parent.getprevious() is not None:
+                    del parent.getparent()[0]
+    except Exception:
+        pass
+    return sub_urls, locs
+
+
 def get_urls_from_sitemap(url):
     """Extract URLs from website sitemap."""
     try:
@@ -1615,34 +2243,31 @@ def get_urls_from_sitemap(url):
             "/sitemap1.xml",
             "/sitemap-main.xml",
         ]
-        urls = []
+        urls = set()
+        seen_subs = set()
 
-        for s in sitemap_list:
+        def _fetch_parsed(sm_url):
             try:
-                sm = urllib.parse.urljoin(url, s)
-                r = requests.get(sm, timeout=10)
-                if r.status_code != 200:
-                    continue
-
-                soup = BeautifulSoup(r.text, "xml")
-
-                # Handle sitemap index files
-                for sub in soup.find_all("sitemap"):
-                    loc = sub.find("loc")
-                    if loc:
-                        sub_url = loc.get_text().strip()
-                        try:
-                            sub_r = requests.get(sub_url, timeout=10)
-                            sub_soup = BeautifulSoup(sub_r.text, "xml")
-                            urls += [x.get_text().strip() for x in sub_soup.find_all("loc")]
-                        except Exception:
-                            pass
-
-                urls += [x.get_text().strip() for x in soup.find_all("loc")]
+                return _parse_sitemap(_get_capped(sm_url))
             except Exception:
-                continue
-
-        return list(set(urls))
+                return [], []
+
+        # Probe every candidate root at once, then fetch all index shards in
+        # a second parallel wave, skipping shards more than one index lists
+        with concurrent.futures.ThreadPoolExecutor(max_workers=SITEMAP_WORKERS) as exe:
+            roots = [urllib.parse.urljoin(url, s) for s in sitemap_list]
+            sub_urls = []
+            for index_urls, locs in exe.map(_fetch_parsed, roots):
+                urls.update(locs)
+                for sub_url in index_urls:
+                    if sub_url not in seen_subs:
+                        seen_subs.add(sub_url)
+                        sub_urls.append(sub_url)
+
+            for _, locs in exe.map(_fetch_parsed, sub_urls):
+                urls.update(locs)
+
+        return list(urls)
     except Exception:
         return []
 
@@ -1657,7 +2282,7 @@ def get_urls_from_firecrawl(base_url):
         headers = {"Authorization": f"Bearer {FIRECRAWL_KEY}"}
         payload = {"url": base_url}
 
-        r = requests.post(url, json=payload, headers=headers, timeout=30)
+        r = SESSION.post(url, json=payload, headers=headers, timeout=30)
         links = r.json().get("links", [])
         
         if isinstance(links, list):
@@ -1667,17 +2292,32 @@ def get_urls_from_firecrawl(base_url):
         return []
 
 
-def get_site_urls(base):
-    """Get all URLs from a website using sitemap or Firecrawl."""
+def get_site_urls(base, use_cache=True):
+    """
+    Get all URLs from a website using sitemap or Firecrawl.
+    A list discovered within HTML_CACHE_TTL is reused unless use_cache is False.
+    """
+    if use_cache:
+        cached = html_cache_get(base, kind="urls")
+        if cached is not None:
+            try:
+                urls = json_loads(cached)
+                print(f"⚡ URL list cache hit: {len(urls)} URLs")
+                return urls
+            except Exception:
+                pass
+
     s = get_urls_from_sitemap(base)
     if s:
         print(f"✅ Sitemap URLs: {len(s)}")
+        html_cache_put(base, json_dumps(s), kind="urls")
         return s
 
     print("⚠️ Sitemap not found — trying Firecrawl…")
     f = get_urls_from_firecrawl(base)
     if f:
         print(f"🔥 Firecrawl URLs: {len(f)}")
+        html_cache_put(base, json_dumps(f), kind="urls")
         return f
 
     return [base]
@@ -1685,48 +2325,304 @@ def get_site_urls(base):
 
 # ---------------- Main Page Selection ----------------
 def select_main_pages(urls, base):
-    """Select the most important pages to scrape."""
-    pages = []
+    """
+    Select the most important pages to scrape: the home page plus the best
+    About and Contact pages, where the shortest matching path wins
+    (/about beats /about/team/jane).
+    """
     base = base.rstrip("/")
+    best = {}  # keyword -> (path length, url)
 
     for u in urls:
         try:
-            ul = str(u).lower()
-            if "about" in ul: 
-                pages.append(u)
-            if "contact" in ul: 
-                pages.append(u)
+            path = urllib.parse.urlsplit(str(u)).path.lower()
         except Exception:
             continue
+        for keyword in ("about", "contact"):
+            if keyword in path and (keyword not in best or len(path) < best[keyword][0]):
+                best[keyword] = (len(path), u)
 
-    if base not in pages:
-        pages.insert(0, base)
+    pages = [base] + [best[k][1] for k in ("about", "contact") if k in best]
+
+    # Remove duplicates (ignoring case of the host, a trailing slash and any
+    # #fragment, so /about and /about/ aren't fetched twice), keep order, limit to 3
+    unique = {}
+    for page in pages:
+        parts = urllib.parse.urlsplit(str(page))
+        key = (parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query)
+        unique.setdefault(key, page)
+    return list(unique.values())[:3]
+
+
+def is_contact_page(url):
+    """True for a URL whose path names a contact page (as select_main_pages picks them)."""
+    try:
+        return "contact" in urllib.parse.urlsplit(str(url)).path.lower()
+    except Exception:
+        return False
+
+
+# ---------------- Embedding Cache ----------------
+# Embeddings are deterministic per (model, text), so they are kept in a small
+# SQLite file and only cache misses are sent to the API. Vectors are stored as
+# raw float32 bytes (~4x smaller than JSON text and no parsing on read).
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "./cache/embeddings.sqlite")
+_embed_cache_conn = None
+_embed_cache_lock = threading.Lock()
+
+
+def _embed_cache():
+    """Open (once) the embedding cache database; None if it can't be used."""
+    global _embed_cache_conn
+    if _embed_cache_conn is None:
+        try:
+            os.makedirs(os.path.dirname(EMBED_CACHE_PATH) or ".", exist_ok=True)
+            conn = sqlite3.connect(EMBED_CACHE_PATH, check_same_thread=False, timeout=10)
+            # WAL lets several API workers read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS embedding_vectors (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            # Superseded by chat_completions: rows had no timestamp and could hold unparseable replies
+            conn.execute("DROP TABLE IF EXISTS completions")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_completions "
+                "(key TEXT PRIMARY KEY, site TEXT NOT NULL, content TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS semantic_completions "
+                "(site TEXT NOT NULL, model TEXT NOT NULL, vector BLOB NOT NULL, content TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS semantic_completions_site ON semantic_completions (site, model)")
+            conn.commit()
+            _embed_cache_conn = conn
+        except Exception as e:
+            print(f"⚠️ Embedding cache unavailable: {e}")
+            _embed_cache_conn = False
+    return _embed_cache_conn or None
 
-    # Remove duplicates, keep order, limit to 3
-    seen = set()
-    unique_pages = []
-    for p in pages:
-        if p not in seen:
-            seen.add(p)
-            unique_pages.append(p)
-    
-    return unique_pages[:3]
+
+def embedding_cache_key(text):
+    """Cache key for one embedding input."""
+    return hashlib.sha256((EMBEDDING_MODEL + "\0" + text).encode("utf-8")).hexdigest()
+
+
+def embedding_cache_get(keys):
+    """Return {key: vector} for the keys already cached."""
+    found = {}
+    if not keys:
+        return found
+    with _embed_cache_lock:
+        conn = _embed_cache()
+        if conn is None:
+            return found
+        try:
+            unique = list(dict.fromkeys(keys))
+            for b in range(0, len(unique), 500):  # stay under SQLite's variable limit
+                part = unique[b:b+500]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embedding_vectors WHERE key IN ({','.join('?' * len(part))})",
+                    part
+                )
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32).tolist()
+        except Exception as e:
+            print(f"⚠️ Embedding cache read error: {e}")
+    return found
+
+
+def embedding_cache_put(vectors):
+    """Store {key: vector} pairs."""
+    with _embed_cache_lock:
+        conn = _embed_cache()
+        if conn is None:
+            return
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_vectors (key, vector) VALUES (?, ?)",
+                [(k, np.asarray(v, dtype=np.float32).tobytes()) for k, v in vectors.items()]
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"⚠️ Embedding cache write error: {e}")
+
+
+# Chat completions for an identical (model, prompt) are reused from the same
+# database for COMPLETION_CACHE_TTL seconds, so re-running over unchanged
+# context costs no API call. Only replies that parsed as JSON are stored.
+COMPLETION_CACHE_TTL = int(os.getenv("COMPLETION_CACHE_TTL", "86400"))
+
+
+def completion_cache_key(model, prompt):
+    """Cache key for one chat completion request."""
+    return hashlib.sha256((model + "\0" + prompt).encode("utf-8")).hexdigest()
+
+
+def completion_cache_get(key):
+    """Return the cached completion text for `key`, or None if missing or expired."""
+    with _embed_cache_lock:
+        conn = _embed_cache()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT content FROM chat_completions WHERE key = ? AND created >= ?",
+                (key, time.time() - COMPLETION_CACHE_TTL)
+            ).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            print(f"⚠️ Completion cache read error: {e}")
+            return None
+
+
+def completion_cache_put(key, content, site=""):
+    """Store one completion text (tagged with its site for clearing); expired rows are dropped."""
+    with _embed_cache_lock:
+        conn = _embed_cache()
+        if conn is None:
+            return
+        try:
+            now = time.time()
+            conn.execute("DELETE FROM chat_completions WHERE created < ?", (now - COMPLETION_CACHE_TTL,))
+            conn.execute(
+                "INSERT OR REPLACE INTO chat_completions (key, site, content, created) VALUES (?, ?, ?, ?)",
+                (key, site, content, now)
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"⚠️ Completion cache write error: {e}")
+
+
+def completion_cache_clear(site=None):
+    """Drop cached completions (exact and semantic) for `site`, or all of them."""
+    with _embed_cache_lock:
+        conn = _embed_cache()
+        if conn is None:
+            return
+        where, params = ("WHERE site = ?", (site,)) if site else ("", ())
+        conn.execute(f"DELETE FROM chat_completions {where}", params)
+        conn.execute(f"DELETE FROM semantic_completions {where}", params)
+        conn.commit()
+
+
+# A re-scrape of the same site often differs only in incidental text (a date,
+# a rotating banner), so the exact prompt key misses. With SEMANTIC_CACHE_DISTANCE
+# set, a completion is reused when the retrieved context's mean embedding is
+# within that cosine distance of an earlier one for the same site (0 disables).
+# Lookups never cross sites: similar businesses must not share answers.
+SEMANTIC_CACHE_DISTANCE = float(os.getenv("SEMANTIC_CACHE_DISTANCE", "0"))
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "86400"))
+
+
+def semantic_cache_get(site, model, vector):
+    """Return the closest fresh completion for `site` within SEMANTIC_CACHE_DISTANCE, or None."""
+    with _embed_cache_lock:
+        conn = _embed_cache()
+        if conn is None:
+            return None
+        try:
+            rows = conn.execute(
+                "SELECT vector, content FROM semantic_completions WHERE site = ? AND model = ? AND created >= ?",
+                (site, model, time.time() - SEMANTIC_CACHE_TTL)
+            ).fetchall()
+        except Exception as e:
+            print(f"⚠️ Semantic cache read error: {e}")
+            return None
+    if not rows:
+        return None
+    vectors = np.stack([np.frombuffer(v, dtype=np.float32) for v, _ in rows])
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(vector)
+    distances = 1.0 - (vectors @ vector) / np.maximum(norms, 1e-12)
+    best = int(np.argmin(distances))
+    return rows[best][1] if distances[best] <= SEMANTIC_CACHE_DISTANCE else None
+
+
+def semantic_cache_put(site, model, vector, content):
+    """Store one completion with its context vector; expired rows for the site are dropped."""
+    with _embed_cache_lock:
+        conn = _embed_cache()
+        if conn is None:
+            return
+        try:
+            now = time.time()
+            conn.execute(
+                "DELETE FROM semantic_completions WHERE site = ? AND created < ?",
+                (site, now - SEMANTIC_CACHE_TTL)
+            )
+            conn.execute(
+                "INSERT INTO semantic_completions (site, model, vector, content, created) VALUES (?, ?, ?, ?, ?)",
+                (site, model, np.asarray(vector, dtype=np.float32).tobytes(), content, now)
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"⚠️ Semantic cache write error: {e}")
+
+
+# ---------------- RAG Result Cache ----------------
+# The extracted fields are deterministic for a given site and page text, so a
+# repeat run within RAG_CACHE_TTL seconds is answered from disk (0 disables).
+# Each site gets its own directory so its results can be cleared on their own.
+RAG_CACHE_DIR = os.getenv("RAG_CACHE_DIR", "./cache/rag")
+RAG_CACHE_TTL = int(os.getenv("RAG_CACHE_TTL", "86400"))
+
+
+def rag_cache_key(site_url, chunks):
+    """Cache key for one site URL plus the exact chunks fed to rag_extract."""
+    text_digest = hashlib.sha256("\n".join(chunks).encode("utf-8")).digest()
+    return hashlib.sha256(site_url.encode("utf-8") + b"\0" + text_digest).hexdigest()
+
+
+def rag_cache_path(site_url, key):
+    """Cache file for one result of `site_url`."""
+    site_dir = hashlib.sha256(site_url.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(RAG_CACHE_DIR, site_dir, f"{key}.json")
+
+
+def rag_cache_get(site_url, key):
+    """Return the cached result for `key`, or None if missing or expired."""
+    path = rag_cache_path(site_url, key)
+    try:
+        if time.time() - os.path.getmtime(path) > RAG_CACHE_TTL:
+            return None
+        with open(path, "rb") as f:
+            return json_loads(f.read())
+    except Exception:
+        return None
+
+
+def rag_cache_put(site_url, key, data):
+    """Store one result."""
+    try:
+        write_file_atomic(rag_cache_path(site_url, key), json_dumps(data))
+        prune_cache_dir(RAG_CACHE_DIR, RAG_CACHE_TTL)
+    except Exception as e:
+        print(f"⚠️ RAG cache write error: {e}")
+
+
+def rag_cache_clear(site_url=None):
+    """Delete the cached results for `site_url`, or for every site when none is given."""
+    path = os.path.dirname(rag_cache_path(site_url, "")) if site_url else RAG_CACHE_DIR
+    shutil.rmtree(path, ignore_errors=True)
 
 
 # ---------------- RAG Extraction ----------------
+def chunk_point_id(chunk):
+    """Stable Qdrant point id (a UUID) derived from the chunk text."""
+    return str(uuid.UUID(bytes=hashlib.blake2s(chunk.encode("utf-8"), digest_size=16).digest()))
+
+
 def sanitize_collection_name(url):
     """Create a safe collection name from URL."""
     try:
         # Remove protocol
-        name = re.sub(r'^https?://', '', str(url))
+        name = _URL_SCHEME_RE.sub('', str(url))
         # Remove www
-        name = re.sub(r'^www\.', '', name)
+        name = _WWW_PREFIX_RE.sub('', name)
         # Replace all non-alphanumeric with underscore
-        name = re.sub(r'[^a-zA-Z0-9]', '_', name)
+        name = _NON_ALNUM_RE.sub('_', name)
         # Remove leading/trailing underscores
         name = name.strip('_')
         # Collapse multiple underscores
-        name = re.sub(r'_+', '_', name)
+        name = _MULTI_UNDERSCORE_RE.sub('_', name)
         # Ensure it starts with a letter
         if name and not name[0].isalpha():
             name = 'c_' + name
@@ -1737,12 +2633,97 @@ def sanitize_collection_name(url):
         return "default_collection"
 
 
-def rag_extract(chunks, site_url):
+def strip_code_fence(text):
     """
-    If Qdrant is available we index/query there.
-    If not available, fall back to joining top chunks as context.
+    The model's reply without a Markdown ``` or ~~~ fence around its JSON
+    (an optional "json" tag and any preamble line before the fence go too).
+    """
+    text = text.strip()
+    for fence in ("```", "~~~"):
+        start = text.find(fence)
+        # Only a fence that opens the reply or a line, not backticks inside a value
+        if start == -1 or (start and text[start - 1] != "\n"):
+            continue
+        body = text[start + len(fence):].removeprefix("json")
+        end = body.rfind(fence)
+        return (body[:end] if end != -1 else body).strip()
+    return text
+
+
+def read_json_stream(stream):
+    """
+    Text of a streamed chat completion, cut off as soon as the top-level JSON
+    object closes. JSON mode can pad a reply with whitespace up to the token
+    limit; nothing after the closing brace is worth waiting for.
+    """
+    parts = []
+    depth, in_string, escaped = 0, False, False
+    try:
+        for event in stream:
+            if not event.choices:
+                continue
+            piece = event.choices[0].delta.content or ""
+            for i, ch in enumerate(piece):
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == "\\":
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = True
+                elif ch == "{":
+                    depth += 1
+                elif ch == "}" and depth:
+                    depth -= 1
+                    if not depth:
+                        parts.append(piece[:i + 1])
+                        return "".join(parts)
+            parts.append(piece)
+    finally:
+        # Drops the connection, so the server stops generating
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+    return "".join(parts)
+
+
+@functools.cache
+def rag_query_embedding():
+    """Embedding of the constant RAG_QUERY, computed once per process."""
+    key = embedding_cache_key(RAG_QUERY)
+    vector = embedding_cache_get([key]).get(key)
+    if vector is None:
+        vector = embed_texts([RAG_QUERY])[0]
+        embedding_cache_put({key: vector})
+    return np.asarray(vector, dtype=np.float32)
+
+
+def rag_extract(chunks, site_url, use_cache=True):
+    """
+    Pick the chunks most similar to RAG_QUERY (in memory, or via Qdrant when
+    RAG_USE_QDRANT is set) and have the LLM extract business fields from them.
+    Falls back to the first chunks as context if retrieval fails.
+    Parsed results are cached on disk per site and text; use_cache=False skips
+    every cache read (fresh results are still stored for later runs).
     """
     context = ""
+    picked = []  # the retrieved chunks behind `context`
+    # Overlapping pages (shared header/footer text) repeat chunks verbatim;
+    # keep the first of each so duplicates neither embed nor crowd the top-k
+    chunks = list(dict.fromkeys(str(c).strip() for c in chunks if str(c).strip()))
+
+    cache_key = rag_cache_key(site_url, chunks) if RAG_CACHE_TTL > 0 else None
+    if cache_key and use_cache:
+        cached = rag_cache_get(site_url, cache_key)
+        if cached is not None:
+            print("   ⚡ RAG result cache hit")
+            return cached
+
+    if len(chunks) > MAX_CHUNKS:
+        print(f"   ✂️ Keeping {MAX_CHUNKS} of {len(chunks)} chunks for embedding")
+        chunks = limit_chunks(chunks)
 
     def get_embeddings(texts):
         if isinstance(texts, str):
@@ -1751,61 +2732,117 @@ def rag_extract(chunks, site_url):
             texts = [str(texts)]
         clean_texts = [str(t)[:8000] for t in texts]
         try:
-            resp = openai_client.embeddings.create(
-                model="text-embedding-3-small",
-                input=clean_texts
-            )
-            return [item.embedding for item in resp.data]
+            keys = [embedding_cache_key(t) for t in clean_texts]
+            cached = embedding_cache_get(keys)
+            # One index per distinct uncached text
+            misses, queued = [], set()
+            for i, k in enumerate(keys):
+                if k not in cached and k not in queued:
+                    queued.add(k)
+                    misses.append(i)
+
+            fresh = {}
+            for b in range(0, len(misses), EMBED_BATCH):
+                batch = misses[b:b+EMBED_BATCH]
+                vectors = embed_texts([clean_texts[i] for i in batch])
+                for i, vector in zip(batch, vectors):
+                    fresh[keys[i]] = vector
+
+            if fresh:
+                embedding_cache_put(fresh)
+            if cached:
+                print(f"   ⚡ Embedding cache: {len(cached)} hits, {len(misses)} new")
+            return [cached[k] if k in cached else fresh[k] for k in keys]
         except Exception as e:
             print("❌ Embedding ERROR:", e)
             raise
 
-    if qdrant_client:
+    if len(chunks) <= RAG_TOP_K:
+        # Every chunk would be retrieved anyway; skip embedding and scoring
+        picked = chunks
+        context = " ".join(chunks)
+    elif qdrant_client:
         try:
             cname = sanitize_collection_name(site_url)
-
-            # Recreate collection for fresh data each run
-            try:
-                qdrant_client.delete_collection(cname)
-            except Exception:
-                pass
-            qdrant_client.create_collection(
-                collection_name=cname,
-                vectors_config=VectorParams(size=3072, distance=Distance.COSINE)
-            )
+            if USE_LOCAL_EMBEDDINGS:
+                # Local vectors have a different size; they can't share a collection
+                cname = cname[:57] + "_local"
+
+            # The collection persists across runs; points are keyed by chunk
+            # content, so re-scrapes upsert in place instead of rebuilding.
+            # One left behind with another vector size (older embedding model)
+            # would reject every upsert, so it is rebuilt.
+            exists = qdrant_client.collection_exists(cname)
+            if exists:
+                vectors = qdrant_client.get_collection(cname).config.params.vectors
+                if getattr(vectors, "size", None) != EMBEDDING_DIM:
+                    print(f"🔄 Recreating Qdrant collection {cname}: vector size differs from {EMBEDDING_DIM}")
+                    qdrant_client.delete_collection(cname)
+                    exists = False
+            if not exists:
+                qdrant_client.create_collection(
+                    collection_name=cname,
+                    vectors_config=VectorParams(size=EMBEDDING_DIM, distance=Distance.COSINE),
+                    # int8 vectors kept in RAM: 4x smaller index, faster scoring
+                    quantization_config=ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+                    )
+                )
 
             print(f"✅ Using Qdrant collection: {cname}")
-            BATCH = 8
-            chunks = [str(c).strip() for c in chunks if str(c).strip()]
-
-            for b in range(0, len(chunks), BATCH):
-                batch = chunks[b:b+BATCH]
-                emb = get_embeddings(batch)
+            ids = [chunk_point_id(chunk) for chunk in chunks]
+
+            # Points from earlier scrapes are already indexed; only embed and
+            # upsert the chunks this collection hasn't seen
+            existing = set()
+            if ids:
+                existing = {
+                    str(p.id) for p in qdrant_client.retrieve(
+                        collection_name=cname, ids=ids, with_payload=False, with_vectors=False
+                    )
+                }
+            new = [i for i, pid in enumerate(ids) if pid not in existing]
+            if existing:
+                print(f"   ⚡ Qdrant: {len(existing)} chunks already indexed, {len(new)} new")
+
+            # One upsert for the new chunks; chunk counts are small
+            if new:
+                emb = get_embeddings([chunks[i] for i in new])
                 points = [
                     PointStruct(
-                        id=b + i,
-                        vector=emb[i],
-                        payload={"document": batch[i], "chunk": b + i}
+                        id=ids[i],
+                        vector=vector,
+                        payload={"document": chunks[i], "chunk": i}
                     )
-                    for i in range(len(batch))
+                    for i, vector in zip(new, emb)
                 ]
                 qdrant_client.upsert(collection_name=cname, points=points)
 
-            query_emb = get_embeddings(
-                "company name, about us, services, contact information, email, phone, office address, location"
-            )[0]
-            results = qdrant_client.search(
+            # Only score this run's chunks, not stale ones from earlier scrapes
+            results = qdrant_client.query_points(
                 collection_name=cname,
-                query_vector=query_emb,
-                limit=6
-            )
-            docs = [hit.payload.get("document", "") for hit in results]
-            context = " ".join(docs) if docs else " ".join(chunks[:6])
+                query=rag_query_embedding().tolist(),
+                query_filter=Filter(must=[HasIdCondition(has_id=ids)]),
+                limit=RAG_TOP_K
+            ).points
+            picked = [hit.payload.get("document", "") for hit in results]
+            context = " ".join(picked) if picked else " ".join(chunks[:RAG_TOP_K])
         except Exception as e:
             print("⚠️ Qdrant operation failed, falling back. Error:", str(e))
-            context = " ".join(chunks[:6])
+            context = " ".join(chunks[:RAG_TOP_K])
     else:
-        context = " ".join(chunks[:6])
+        try:
+            # Cosine top-k in NumPy; the query vector is memoized per process
+            emb = np.asarray(get_embeddings(chunks), dtype=np.float32)
+            query_emb = rag_query_embedding()
+            norms = np.linalg.norm(emb, axis=1) * np.linalg.norm(query_emb)
+            scores = (emb @ query_emb) / np.maximum(norms, 1e-12)
+            top = np.argsort(-scores)[:RAG_TOP_K]
+            picked = [chunks[i] for i in top]
+            context = " ".join(picked)
+        except Exception as e:
+            print("⚠️ In-memory retrieval failed, falling back. Error:", str(e))
+            context = " ".join(chunks[:RAG_TOP_K])
 
     prompt = f"""
 You are a world-class business data extractor. Your job is to extract accurate business information from website content.
@@ -1866,17 +2903,44 @@ Website content to extract from:
 """
 
     try:
-        r = openai_client.chat.completions.create(
-            model="gpt-5-nano",
-            messages=[{"role":"user","content":prompt}],
-        )
+        completion_key = completion_cache_key(CHAT_MODEL, prompt)
+        out = completion_cache_get(completion_key) if use_cache else None
+        if out is not None:
+            print("   ⚡ Completion cache hit")
 
-        out = r.choices[0].message.content
-        out = re.sub(r'```json|```', '', out).strip()
+        context_vec = None
+        if out is None and use_cache and SEMANTIC_CACHE_DISTANCE > 0 and picked:
+            try:
+                context_vec = np.asarray(get_embeddings(picked), dtype=np.float32).mean(axis=0)
+                out = semantic_cache_get(site_url, CHAT_MODEL, context_vec)
+                if out is not None:
+                    print("   ⚡ Semantic cache hit")
+            except Exception as e:
+                print(f"⚠️ Semantic cache lookup failed: {e}")
+
+        fresh = out is None
+        if fresh:
+            r = get_openai_client().chat.completions.create(
+                model=CHAT_MODEL,
+                messages=[{"role":"user","content":prompt}],
+                # JSON mode: the reply is a bare JSON object, no Markdown fence or prose
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+            out = read_json_stream(r)
+        # Only completions cached before JSON mode can still carry a fence
+        out = strip_code_fence(out)
 
         try:
-            data = json.loads(out)
-            
+            data = json_loads(out)
+
+            # Cache the raw reply only once it parsed; a truncated or invalid
+            # one would otherwise be replayed on every later run
+            if fresh and isinstance(data, dict):
+                completion_cache_put(completion_key, out, site=site_url)
+                if context_vec is not None:
+                    semantic_cache_put(site_url, CHAT_MODEL, context_vec, out)
+
             # Post-process to clean and deduplicate all fields
             if "Email" in data:
                 emails = data["Email"] if isinstance(data["Email"], list) else [data["Email"]] if data["Email"] else []
@@ -1890,6 +2954,8 @@ Website content to extract from:
                 addresses = data["Address"] if isinstance(data["Address"], list) else [data["Address"]] if data["Address"] else []
                 data["Address"] = clean_address_list(addresses)
             
+            if cache_key:
+                rag_cache_put(site_url, cache_key, data)
             return data
         except json.JSONDecodeError:
             return {"raw": out}
@@ -1899,13 +2965,20 @@ Website content to extract from:
 
 
 # ---------------- Logo Extraction ----------------
-def extract_logo_url(html, base_url):
-    """Find logo URL from common locations."""
+# Only the tags the logo lookup inspects (an <a> keeps its nested <svg>)
+_LOGO_STRAINER = SoupStrainer(["a", "img", "link", "svg"])
+
+def extract_logo_url(html, base_url, soup=None):
+    """
+    Find logo URL from common locations.
+    Pass `soup` to reuse a full tree the caller already parsed from `html`.
+    """
     if not html:
         return ""
     
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        if soup is None:
+            soup = BeautifulSoup(html, "lxml", parse_only=_LOGO_STRAINER)
 
         logo_keywords = ["logo", "brand", "site-logo", "header-logo", "company-logo"]
         
@@ -1959,7 +3032,7 @@ def extract_logo_url(html, base_url):
         for path in favicon_paths:
             favicon_url = urllib.parse.urljoin(base_url, path)
             try:
-                r = requests.head(favicon_url, timeout=5)
+                r = SESSION.head(favicon_url, timeout=5)
                 if r.status_code == 200:
                     return favicon_url
             except Exception:
@@ -1970,44 +3043,74 @@ def extract_logo_url(html, base_url):
     return ""
 
 
+# ---------------- Page Parsing ----------------
+def parse_page(page, html):
+    """
+    Text, social links and theme colours for one fetched page.
+    Module-level so it can run in a worker process.
+    """
+    try:
+        # One parse shared by the social and theme-colour extractors
+        soup = BeautifulSoup(html or "", "lxml")
+        social = extract_social_links_from_html(html, soup=soup)
+        colors = extract_theme_colors(html, page, soup=soup)
+        text = html_to_text(html)
+        return text, social, colors
+    except Exception:
+        return "", {"Facebook": "", "Instagram": "", "LinkedIn": "", "Twitter / X": ""}, {}
+
+
 # ---------------- Main Flow ----------------
 if __name__ == "__main__":
     site_url = input("Enter website URL: ").strip()
     if not site_url.startswith("http"):
         site_url = "https://" + site_url
 
+    # --no-cache re-fetches pages and re-runs extraction instead of reusing disk caches
+    use_cache = "--no-cache" not in sys.argv[1:]
+
     print("🔍 Fetching URLs…")
-    urls = get_site_urls(site_url)
+    urls = get_site_urls(site_url, use_cache=use_cache)
     main_pages = select_main_pages(urls, site_url)
 
     print("\n📌 Selected pages:")
     for p in main_pages:
         print(" →", p)
 
-    all_text = ""
+    page_texts = []
     all_html = ""
+    # The contact page alone, tried first for emails/phones
+    contact_text = ""
+    contact_html = ""
     all_social = {"Facebook": "", "Instagram": "", "LinkedIn": "", "Twitter / X": ""}
     theme_colors = {}
 
     # ---------------- Parallel Scrape ----------------
-    def scrape_single_page(page):
-        try:
-            html = fetch_page(page)
-            social = extract_social_links_from_html(html)
-            colors = extract_theme_colors(html, page)
-            soup = BeautifulSoup(html or "", "html.parser")
-            [s.extract() for s in soup(["script", "style", "noscript"])]
-            text = clean_text(soup.get_text(" ", strip=True))
-            return text, social, html, colors
-        except Exception:
-            return "", {"Facebook": "", "Instagram": "", "LinkedIn": "", "Twitter / X": ""}, "", {}
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as exe:
-        results = list(exe.map(scrape_single_page, main_pages))
+    # Pages are fetched over the shared pooled SESSION. Parsing runs on the
+    # same worker thread right after each fetch, or with PARSE_WORKERS set,
+    # in worker processes so the CPU-bound part isn't held by the GIL.
+    if PARSE_WORKERS > 0:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=PARSE_WORKERS) as parse_pool:
+            pending = [
+                (page, html, parse_pool.submit(parse_page, page, html))
+                for page, html in fetch_pages(main_pages, use_cache=use_cache)
+            ]
+            scraped = [(page, html, future.result()) for page, html, future in pending]
+    else:
+        scraped = (
+            (page, html, parsed) for page, (html, parsed) in
+            fetch_pages(
+                main_pages, use_cache=use_cache,
+                process=lambda page, html: (html, parse_page(page, html))
+            )
+        )
 
-    for text, social, html, colors in results:
-        all_text += " " + (text or "")
+    for page, html, (text, social, colors) in scraped:
+        page_texts.append(text)
         all_html += " " + (html or "")
+        if is_contact_page(page):
+            contact_text += " " + (text or "")
+            contact_html += " " + (html or "")
         for k, v in social.items():
             if v and not all_social[k]:
                 all_social[k] = v
@@ -2015,21 +3118,20 @@ if __name__ == "__main__":
         if not theme_colors.get("primary_color") and colors.get("primary_color"):
             theme_colors = colors
 
-    all_text = clean_text(all_text)
-    
-    # Remove duplicate words while preserving order
-    try:
-        all_text = " ".join(dict.fromkeys(all_text.split()))
-    except Exception:
-        pass
+    all_text = clean_text(" ".join(budget_page_texts(page_texts)))
 
-    chunks = chunk_text(all_text)
+    chunks = chunk_text(dedupe_sentences(all_text))
 
     print("\n🧠 Running RAG…")
-    data = rag_extract(chunks, site_url)
+    # The LLM round-trip is network-bound; the regex fallbacks run meanwhile
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        rag_future = pool.submit(rag_extract, chunks, site_url, use_cache=use_cache)
+        extracted_emails, extracted_phones, extracted_addresses = extract_fallback_contacts(
+            all_text, all_html, contact_text, contact_html
+        )
+        data = rag_future.result()
 
-    # Fallback extraction with deduplication
-    extracted_emails = extract_all_emails(all_text, all_html)
+    # Merge fallback extraction with deduplication
     existing_emails = data.get("Email", [])
     if isinstance(existing_emails, str):
         existing_emails = [existing_emails] if existing_emails else []
@@ -2039,7 +3141,6 @@ if __name__ == "__main__":
     data["Email"] = clean_email_list(all_emails)
 
     # Clean phones
-    extracted_phones = extract_all_phones(all_text)
     existing_phones = data.get("Phone", [])
     if isinstance(existing_phones, str):
         existing_phones = [existing_phones] if existing_phones else []
@@ -2049,7 +3150,6 @@ if __name__ == "__main__":
     data["Phone"] = clean_phone_list(all_phones)
 
     # Clean addresses
-    extracted_addresses = extract_all_addresses(all_text)
     existing_addresses = data.get("Address", [])
     if isinstance(existing_addresses, str):
         existing_addresses = [existing_addresses] if existing_addresses else []
@@ -2078,5 +3178,5 @@ if __name__ == "__main__":
     data["URL"] = site_url
 
     print("\n\n✅ Final Extracted Data:")
-    print(json.dumps(data, indent=2, ensure_ascii=False))
+    print(json_dumps(data, indent=True))
     
\ No newline at end of file